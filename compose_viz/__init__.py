@@ -1,2 +1,6 @@
 __app_name__ = "compose_viz"
 __version__ = "0.3.2"
+
+from compose_viz.api import render, render_async, render_legend  # noqa: E402
+
+__all__ = ["render", "render_async", "render_legend"]
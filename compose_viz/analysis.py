@@ -0,0 +1,550 @@
+import heapq
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from compose_viz.models.compose import Compose
+from compose_viz.models.condition import Condition
+from compose_viz.models.healthcheck import Healthcheck
+from compose_viz.models.port import Port, Protocol
+from compose_viz.models.resources import Resources
+from compose_viz.models.service import Service
+from compose_viz.models.volume import Volume, VolumeType
+
+DEFAULT_TOP = 5
+
+# host addresses which bind a port on every interface
+WILDCARD_IPS = {"0.0.0.0", "::", ""}
+
+# conditions which hold a dependent back until the dependency is up, instead of just created and started
+WAITING_CONDITIONS = {Condition.service_healthy, Condition.service_completed_successfully}
+
+
+def dependency_graph(compose: Compose) -> Dict[str, List[str]]:
+    # links imply a dependency like depends_on does, undeclared targets become vertices of their own,
+    # extends only shares configuration and is no dependency, neither here nor in the fan-in and fan-out
+    graph: Dict[str, List[str]] = {service.name: [] for service in compose.services}
+    for service in compose.services:
+        for target in service.depends_on + [link.split(":", 1)[0] for link in service.links]:
+            graph[service.name].append(target)
+            graph.setdefault(target, [])
+    return graph
+
+
+def strongly_connected_components(graph: Dict[str, List[str]]) -> List[List[str]]:
+    # iterative tarjan, components come out in reverse topological order: dependencies before dependents
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    stack: List[str] = []
+    on_stack = set()
+    components: List[List[str]] = []
+
+    for root in graph:
+        if root in index:
+            continue
+
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work: List[Tuple[str, Iterator[str]]] = [(root, iter(graph[root]))]
+        while work:
+            vertex, neighbors = work[-1]
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = low[neighbor] = len(index)
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, iter(graph[neighbor])))
+                    break
+                if neighbor in on_stack:
+                    low[vertex] = min(low[vertex], index[neighbor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[vertex])
+                if low[vertex] == index[vertex]:
+                    component: List[str] = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == vertex:
+                            break
+                    components.append(sorted(component))
+
+    return components
+
+
+def longest_chain(graph: Dict[str, List[str]], components: List[List[str]]) -> List[str]:
+    # longest path over the condensation, a cycle counts as one step named after its first member
+    component_of = {member: index for index, component in enumerate(components) for member in component}
+    lengths: List[int] = []
+    successors: List[int] = []
+    for index, component in enumerate(components):
+        best_length, best_successor = 0, -1
+        for member in component:
+            for target in graph[member]:
+                successor = component_of[target]
+                if successor != index and lengths[successor] > best_length:
+                    best_length, best_successor = lengths[successor], successor
+        lengths.append(best_length + 1)
+        successors.append(best_successor)
+
+    if not components:
+        return []
+
+    chain: List[str] = []
+    current = max(range(len(components)), key=lambda index: (lengths[index], components[index][0]))
+    while current != -1:
+        chain.append(components[current][0])
+        current = successors[current]
+    return chain
+
+
+def ranking(counter: Counter) -> Dict[str, int]:
+    return dict(sorted(counter.items(), key=lambda item: (-item[1], item[0])))
+
+
+def compute_stats(compose: Compose) -> Dict[str, Any]:
+    # a single pass over the services collects every count, the graph algorithms are linear
+    graph = dependency_graph(compose)
+
+    fan_in: Counter = Counter()
+    fan_out: Counter = Counter()
+    networks: Counter = Counter()
+    volumes: Counter = Counter()
+    for service in compose.services:
+        targets = set(graph[service.name])
+        fan_out[service.name] = len(targets)
+        fan_in[service.name] += 0
+        for target in targets:
+            fan_in[target] += 1
+        networks.update(set(service.networks))
+        volumes.update({volume.source for volume in service.volumes if volume.source})
+
+    components = strongly_connected_components(graph)
+    cycles = [component for component in components if len(component) > 1 or component[0] in graph[component[0]]]
+
+    return {
+        "services": len(compose.services),
+        "networks": len(networks),
+        "volumes": len(volumes),
+        "dependencies": sum(len(targets) for targets in graph.values()),
+        "fan_in": ranking(fan_in),
+        "fan_out": ranking(fan_out),
+        "longest_chain": longest_chain(graph, components),
+        "components": len(components),
+        "cycles": sorted(cycles),
+        "shared_networks": ranking(Counter({name: count for name, count in networks.items() if count > 1})),
+        "shared_volumes": ranking(Counter({name: count for name, count in volumes.items() if count > 1})),
+    }
+
+
+def format_stats(stats: Dict[str, Any], top: int = DEFAULT_TOP) -> str:
+    def highest(counts: Dict[str, int]) -> str:
+        return ", ".join(f"{name} ({count})" for name, count in list(counts.items())[:top]) or "-"
+
+    lines = [
+        f"services: {stats['services']}",
+        f"networks: {stats['networks']}",
+        f"volumes: {stats['volumes']}",
+        f"dependencies: {stats['dependencies']}",
+        f"highest fan-in: {highest(stats['fan_in'])}",
+        f"highest fan-out: {highest(stats['fan_out'])}",
+        f"longest dependency chain ({len(stats['longest_chain'])}): {' -> '.join(stats['longest_chain']) or '-'}",
+        f"strongly connected components: {stats['components']}",
+        f"dependency cycles: {'; '.join(', '.join(cycle) for cycle in stats['cycles']) or '-'}",
+        f"most shared networks: {highest(stats['shared_networks'])}",
+        f"most shared volumes: {highest(stats['shared_volumes'])}",
+    ]
+    return "\n".join(lines)
+
+
+def startup_conditions(compose: Compose) -> Tuple[Dict[str, Dict[str, Condition]], Dict[str, List[str]]]:
+    # the condition of every depends_on entry and the graph they form, undeclared targets become vertices
+    conditions = {
+        service.name: {
+            depends_on: service.depends_on_conditions.get(depends_on, Condition.service_started)
+            for depends_on in service.depends_on
+        }
+        for service in compose.services
+    }
+    graph: Dict[str, List[str]] = {name: list(depends_on) for name, depends_on in conditions.items()}
+    for depends_on in list(graph.values()):
+        for target in depends_on:
+            graph.setdefault(target, [])
+    return conditions, graph
+
+
+def start_waves(compose: Compose) -> Dict[str, Any]:
+    # services of the same wave start in parallel, a service joins the wave of its dependencies when it only
+    # needs them started and the wave after them when it waits for them to be healthy or to complete
+    conditions, graph = startup_conditions(compose)
+
+    # components are ordered dependencies first, members of a cycle share their wave
+    components = strongly_connected_components(graph)
+    component_of = {member: index for index, component in enumerate(components) for member in component}
+    component_waves: List[int] = []
+    waits_on: Dict[str, List[str]] = {}
+    for index, component in enumerate(components):
+        wave = 0
+        for member in component:
+            for target, condition in conditions.get(member, {}).items():
+                if component_of[target] != index:
+                    wave = max(
+                        wave, component_waves[component_of[target]] + (1 if condition in WAITING_CONDITIONS else 0)
+                    )
+        component_waves.append(wave)
+
+        # the waiting dependencies which put the service into its wave, the ones worth a second look
+        for member in component:
+            blockers = [
+                target
+                for target, condition in conditions.get(member, {}).items()
+                if condition in WAITING_CONDITIONS and component_waves[component_of[target]] + 1 == wave
+            ]
+            if member in conditions and blockers:
+                waits_on[member] = sorted(blockers)
+
+    waves: List[List[str]] = []
+    for service in compose.services:
+        wave = component_waves[component_of[service.name]]
+        waves.extend([] for _ in range(wave + 1 - len(waves)))
+        waves[wave].append(service.name)
+
+    return {
+        "waves": [sorted(wave) for wave in waves],
+        "waits_on": dict(sorted(waits_on.items())),
+        "conditions": {
+            name: {target: condition.value for target, condition in sorted(targets.items())}
+            for name, targets in sorted(conditions.items())
+            if targets
+        },
+        "cycles": sorted(
+            component for component in components if len(component) > 1 or component[0] in graph[component[0]]
+        ),
+    }
+
+
+def format_waves(waves: Dict[str, Any]) -> str:
+    lines: List[str] = []
+    for index, wave in enumerate(waves["waves"]):
+        services = []
+        for name in wave:
+            blockers = ", ".join(
+                f"{target} ({waves['conditions'][name][target]})" for target in waves["waits_on"].get(name, [])
+            )
+            services.append(f"{name} <- {blockers}" if blockers else name)
+        lines.append(f"wave {index}: {'; '.join(services)}")
+    if waves["cycles"]:
+        lines.append(f"dependency cycles: {'; '.join(', '.join(cycle) for cycle in waves['cycles'])}")
+    return "\n".join(lines)
+
+
+def health_delays(healthcheck: Optional[Healthcheck]) -> Tuple[float, float]:
+    # time from start to healthy, expected when the first probe passes and worst case when every probe of the
+    # start period fails and the retries run into their timeouts, before the container is marked unhealthy
+    if healthcheck is None:
+        return 0.0, 0.0
+    expected = healthcheck.start_interval if healthcheck.start_period else healthcheck.interval
+    worst = healthcheck.start_period + healthcheck.retries * (healthcheck.interval + healthcheck.timeout)
+    return expected, worst
+
+
+def startup_times(compose: Compose) -> Dict[str, Any]:
+    # a service starts once every dependency it waits on is ready, and is ready once its own healthcheck passes,
+    # only service_healthy adds the healthcheck of the dependency, the run time of other containers is unknown
+    conditions, graph = startup_conditions(compose)
+    delays = {service.name: health_delays(service.healthcheck) for service in compose.services}
+
+    components = strongly_connected_components(graph)
+    component_of = {member: index for index, component in enumerate(components) for member in component}
+    # (expected, worst case) seconds after `compose up`
+    started: Dict[str, Tuple[float, float]] = {}
+    ready: Dict[str, Tuple[float, float]] = {}
+    previous: Dict[str, Optional[str]] = {}
+    for index, component in enumerate(components):
+        # members of a cycle can not wait on each other, only dependencies outside of it count
+        for member in component:
+            start: Tuple[float, float] = (0.0, 0.0)
+            previous[member] = None
+            for target, condition in conditions.get(member, {}).items():
+                if component_of[target] == index:
+                    continue
+                available = ready[target] if condition == Condition.service_healthy else started[target]
+                if available[::-1] > start[::-1]:
+                    start, previous[member] = available, target
+
+            delay = delays.get(member, (0.0, 0.0))
+            started[member] = start
+            ready[member] = (start[0] + delay[0], start[1] + delay[1])
+
+    times = {
+        service.name: {"expected": ready[service.name][0], "worst": ready[service.name][1]}
+        for service in compose.services
+    }
+
+    critical_path: List[str] = []
+    last = max(times, key=lambda name: (times[name]["worst"], times[name]["expected"], name), default=None)
+    if last is not None and ready[last] != (0.0, 0.0):
+        current: Optional[str] = last
+        while current is not None:
+            critical_path.append(current)
+            current = previous[current]
+        critical_path.reverse()
+
+    # the healthcheck adding the most time to the critical path, the one to tune first
+    checked = [name for name in critical_path if delays.get(name, (0.0, 0.0))[1]]
+    bottleneck = max(checked, key=lambda name: delays[name][1]) if checked else None
+
+    return {
+        "services": dict(sorted(times.items())),
+        "critical_path": critical_path,
+        "expected": times[critical_path[-1]]["expected"] if critical_path else 0.0,
+        "worst": times[critical_path[-1]]["worst"] if critical_path else 0.0,
+        "bottleneck": bottleneck,
+    }
+
+
+def format_startup(startup: Dict[str, Any]) -> str:
+    lines = [
+        f"{name}: ready after {times['expected']:g}s expected, {times['worst']:g}s worst case"
+        for name, times in startup["services"].items()
+    ]
+    if startup["critical_path"]:
+        lines.append(
+            f"critical path: {' -> '.join(startup['critical_path'])} "
+            f"({startup['expected']:g}s expected, {startup['worst']:g}s worst case)"
+        )
+    if startup["bottleneck"]:
+        lines.append(f"slowest healthcheck on the critical path: {startup['bottleneck']}")
+    return "\n".join(lines)
+
+
+def service_resources(service: Service) -> Dict[str, Any]:
+    # totals over all replicas of the service, missing values count as zero
+    resources = service.resources or Resources()
+    return {
+        "replicas": resources.replicas,
+        "cpus_reserved": (resources.cpus_reservation or 0.0) * resources.replicas,
+        "cpus_limit": (resources.cpus_limit or 0.0) * resources.replicas,
+        "memory_reserved": (resources.memory_reservation or 0) * resources.replicas,
+        "memory_limit": (resources.memory_limit or 0) * resources.replicas,
+        "pids_limit": (resources.pids_limit or 0) * resources.replicas,
+        "unlimited": resources.cpus_limit is None or resources.memory_limit is None,
+    }
+
+
+def resource_totals(services: List[Dict[str, Any]]) -> Dict[str, Any]:
+    return {
+        "services": len(services),
+        "cpus_reserved": sum(service["cpus_reserved"] for service in services),
+        "cpus_limit": sum(service["cpus_limit"] for service in services),
+        "memory_reserved": sum(service["memory_reserved"] for service in services),
+        "memory_limit": sum(service["memory_limit"] for service in services),
+        "pids_limit": sum(service["pids_limit"] for service in services),
+        # services without a cpu or memory limit, the limits of the group are a lower bound when there are any
+        "unlimited": sum(1 for service in services if service["unlimited"]),
+    }
+
+
+def resource_budget(compose: Compose) -> Dict[str, Any]:
+    services = {service.name: service_resources(service) for service in compose.services}
+
+    networks: Dict[str, List[Dict[str, Any]]] = {}
+    profiles: Dict[str, List[Dict[str, Any]]] = {}
+    for service in compose.services:
+        for network in set(service.networks):
+            networks.setdefault(network, []).append(services[service.name])
+        for profile in set(service.profiles):
+            profiles.setdefault(profile, []).append(services[service.name])
+
+    return {
+        "services": dict(sorted(services.items())),
+        "networks": {name: resource_totals(members) for name, members in sorted(networks.items())},
+        "profiles": {name: resource_totals(members) for name, members in sorted(profiles.items())},
+        "project": resource_totals(list(services.values())),
+    }
+
+
+def format_bytes(value: float) -> str:
+    for unit in ["B", "KiB", "MiB", "GiB"]:
+        if abs(value) < 1024:
+            return f"{value:g}{unit}"
+        value /= 1024
+    return f"{value:g}TiB"
+
+
+def format_budget(budget: Dict[str, Any]) -> str:
+    rows = [
+        [
+            "scope",
+            "services",
+            "cpus reserved",
+            "cpus limit",
+            "memory reserved",
+            "memory limit",
+            "pids limit",
+            "unlimited",
+        ]
+    ]
+    scopes = [("project", budget["project"])]
+    scopes.extend((f"network:{name}", totals) for name, totals in budget["networks"].items())
+    scopes.extend((f"profile:{name}", totals) for name, totals in budget["profiles"].items())
+    for scope, totals in scopes:
+        rows.append(
+            [
+                scope,
+                str(totals["services"]),
+                f"{totals['cpus_reserved']:g}",
+                f"{totals['cpus_limit']:g}",
+                format_bytes(totals["memory_reserved"]),
+                format_bytes(totals["memory_limit"]),
+                str(totals["pids_limit"]),
+                str(totals["unlimited"]),
+            ]
+        )
+
+    widths = [max(len(row[column]) for row in rows) for column in range(len(rows[0]))]
+    return "\n".join("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip() for row in rows)
+
+
+def resource_heat(budget: Dict[str, Any], metric: str) -> Dict[str, float]:
+    # the limit of every service relative to the largest one, the reservation when there is no limit
+    values = {
+        name: resources[f"{metric}_limit"] or resources[f"{metric}_reserved"]
+        for name, resources in budget["services"].items()
+    }
+    highest = max(values.values(), default=0)
+    return {name: value / highest for name, value in values.items() if highest and value}
+
+
+def host_binding(port: Port) -> Optional[Tuple[str, str, int, int]]:
+    # (host ip, protocol, first port, last port) of a published port, `host_port` is `ip:port` or `ip:first-last`
+    if not port.published:
+        return None
+    host_ip, _, ports = port.host_port.rpartition(":")
+    first, _, last = ports.partition("-")
+    if not first.isdigit() or not (last or first).isdigit():
+        return None
+    # ports without a protocol are published for tcp
+    protocol = Protocol(port.protocol)
+    protocol = Protocol.tcp if protocol == Protocol.any else protocol
+    return host_ip.strip("[]"), protocol.value, int(first), int(last or first)
+
+
+def port_conflicts(compose: Compose) -> List[Dict[str, Any]]:
+    # sweep over the port ranges of each protocol sorted by their first port, keeping the ranges still open
+    # in a heap by their last port, every range is only compared with the ones it overlaps with
+    bindings: Dict[str, List[Tuple[int, int, str, str, str]]] = {}
+    for service in compose.services:
+        for port in service.ports:
+            binding = host_binding(port)
+            if binding is not None:
+                host_ip, protocol, first, last = binding
+                bindings.setdefault(protocol, []).append((first, last, host_ip, service.name, port.host_port))
+
+    conflicts: List[Dict[str, Any]] = []
+    for protocol, ranges in sorted(bindings.items()):
+        open_ranges: List[Tuple[int, int, str, str, str]] = []
+        for binding in sorted(ranges):
+            first, last, host_ip, service, host_port = binding
+            while open_ranges and open_ranges[0][0] < first:
+                heapq.heappop(open_ranges)
+
+            for other_last, other_first, other_ip, other_service, other_host_port in open_ranges:
+                # a wildcard address overlaps with every address, other addresses only with themselves
+                if host_ip != other_ip and host_ip not in WILDCARD_IPS and other_ip not in WILDCARD_IPS:
+                    continue
+                conflicts.append(
+                    {
+                        "protocol": protocol,
+                        "ports": [max(first, other_first), min(last, other_last)],
+                        "services": [other_service, service],
+                        "host_ports": [other_host_port, host_port],
+                        "kind": "conflict" if (other_first, other_last) == (first, last) else "overlap",
+                    }
+                )
+            heapq.heappush(open_ranges, (last, first, host_ip, service, host_port))
+
+    return conflicts
+
+
+def format_conflicts(conflicts: List[Dict[str, Any]]) -> str:
+    lines: List[str] = []
+    for conflict in conflicts:
+        first, last = conflict["ports"]
+        ports = f"{first}-{last}" if first != last else str(first)
+        bindings = zip(conflict["services"], conflict["host_ports"])
+        lines.append(
+            f"{conflict['kind']} on {conflict['protocol']} {ports}: "
+            + ", ".join(f"{service} ({host_port})" for service, host_port in bindings)
+        )
+    return "\n".join(lines) or "no conflicting host ports"
+
+
+def is_writable(volume: Volume) -> bool:
+    return "ro" not in volume.access_mode.split(",")
+
+
+def volume_contention(compose: Compose) -> Dict[str, Any]:
+    # index of every volume and bind mount source to the services writing to and reading from it
+    index: Dict[str, Dict[str, Any]] = {}
+    tmpfs: Dict[str, List[str]] = {}
+    for service in compose.services:
+        for volume in service.volumes:
+            type = VolumeType(volume.type).value
+            if type == VolumeType.tmpfs.value:
+                tmpfs.setdefault(service.name, []).append(volume.target)
+                continue
+
+            entry = index.setdefault(volume.source, {"type": type, "writers": [], "readers": []})
+            mounts = entry["writers"] if is_writable(volume) else entry["readers"]
+            if service.name not in mounts:
+                mounts.append(service.name)
+
+    def mounted_by(entry: Dict[str, Any]) -> int:
+        return len(set(entry["writers"]) | set(entry["readers"]))
+
+    return {
+        # written by several services, the ones contending for the same disk
+        "read_write": {source: entry for source, entry in sorted(index.items()) if len(entry["writers"]) > 1},
+        "bind_mounts": {
+            source: entry
+            for source, entry in sorted(index.items())
+            if entry["type"] == VolumeType.bind.value and mounted_by(entry) > 1
+        },
+        "tmpfs": dict(sorted(tmpfs.items())),
+    }
+
+
+def contended_sources(contention: Dict[str, Any]) -> List[str]:
+    return sorted(set(contention["read_write"]) | set(contention["bind_mounts"]))
+
+
+def contention_subgraph(compose: Compose, contention: Dict[str, Any]) -> Compose:
+    # only the contended volumes and the services mounting them
+    sources = set(contended_sources(contention))
+    services: List[Service] = []
+    for service in compose.services:
+        volumes = [volume for volume in service.volumes if volume.source in sources]
+        if volumes:
+            services.append(Service(name=service.name, image=service.image, volumes=volumes))
+    return Compose(services=services)
+
+
+def format_contention(contention: Dict[str, Any]) -> str:
+    def mounts(entry: Dict[str, Any]) -> str:
+        return ", ".join([f"{name} (rw)" for name in entry["writers"]] + [f"{name} (ro)" for name in entry["readers"]])
+
+    lines = [
+        f"shared read-write {entry['type']} {source}: {mounts(entry)}"
+        for source, entry in contention["read_write"].items()
+    ]
+    lines.extend(
+        f"shared bind mount {source}: {mounts(entry)}"
+        for source, entry in contention["bind_mounts"].items()
+        if source not in contention["read_write"]
+    )
+    lines.extend(f"tmpfs {name}: {', '.join(targets)}" for name, targets in contention["tmpfs"].items())
+    return "\n".join(lines) or "no shared volumes"
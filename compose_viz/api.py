@@ -0,0 +1,75 @@
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Mapping, Optional
+
+from compose_viz import legend
+from compose_viz.exporters import EXPORTERS
+from compose_viz.graph import Graph
+from compose_viz.models.detail_levels import DetailLevels
+from compose_viz.models.layout_engines import LayoutEngines
+from compose_viz.parser import Parser
+
+
+def load_graph(
+    content: str,
+    format: str,
+    root_service: Optional[str] = None,
+    detail: str = DetailLevels.full.value,
+    max_nodes: Optional[int] = None,
+    coalesce_edges: bool = True,
+    environment: Optional[Mapping[str, str]] = None,
+) -> Graph:
+    # documents held in memory are only interpolated from the variables passed explicitly, never from the shell
+    compose = Parser(environment=environment if environment is not None else {}).parse_string(
+        content, root_service=root_service
+    )
+    graph = Graph(compose, "", False, detail=detail, max_nodes=max_nodes, coalesce_edges=coalesce_edges)
+
+    graph.build()
+    if format not in EXPORTERS:
+        graph.emit()
+    return graph
+
+
+def render(
+    content: str,
+    format: str = "svg",
+    root_service: Optional[str] = None,
+    detail: str = DetailLevels.full.value,
+    max_nodes: Optional[int] = None,
+    engine: str = LayoutEngines.auto.value,
+    layout_timeout: Optional[float] = None,
+    coalesce_edges: bool = True,
+    environment: Optional[Mapping[str, str]] = None,
+) -> bytes:
+    graph = load_graph(content, format, root_service, detail, max_nodes, coalesce_edges, environment)
+    return graph.pipe(format, engine=engine, layout_timeout=layout_timeout)
+
+
+async def render_async(
+    content: str,
+    format: str = "svg",
+    root_service: Optional[str] = None,
+    detail: str = DetailLevels.full.value,
+    max_nodes: Optional[int] = None,
+    engine: str = LayoutEngines.auto.value,
+    layout_timeout: Optional[float] = None,
+    coalesce_edges: bool = True,
+    environment: Optional[Mapping[str, str]] = None,
+    semaphore: Optional[asyncio.Semaphore] = None,
+    executor: Optional[Executor] = None,
+) -> bytes:
+    # parsing and model conversion are CPU bound, they run in the executor to keep the event loop responsive
+    graph = await asyncio.get_running_loop().run_in_executor(
+        executor,
+        functools.partial(load_graph, content, format, root_service, detail, max_nodes, coalesce_edges, environment),
+    )
+    return await graph.pipe_async(
+        format, engine=engine, layout_timeout=layout_timeout, semaphore=semaphore, executor=executor
+    )
+
+
+def render_legend(format: str = "svg") -> bytes:
+    # the legend is the same for every graph, it is rendered once per format and cached
+    return legend.render_legend(format)
@@ -0,0 +1,27 @@
+import os
+import tempfile
+from typing import Optional
+
+
+def cache_directory() -> str:
+    return os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "compose-viz")
+
+
+def read_cache(name: str) -> Optional[bytes]:
+    path = os.path.join(cache_directory(), name)
+    if not os.path.isfile(path):
+        return None
+    with open(path, "rb") as cache_file:
+        return cache_file.read()
+
+
+def write_cache(name: str, content: bytes) -> None:
+    # written next to its final path and renamed, so that concurrent runs never read a partial file,
+    # a cache which cannot be written is not an error
+    try:
+        os.makedirs(cache_directory(), exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_directory(), delete=False) as cache_file:
+            cache_file.write(content)
+        os.replace(cache_file.name, os.path.join(cache_directory(), name))
+    except OSError:
+        pass
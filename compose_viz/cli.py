@@ -1,16 +1,39 @@
-from typing import Optional
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
 
+import click
 import typer
+from typer.core import TyperGroup
 
-from compose_viz import __app_name__, __version__
-from compose_viz.graph import Graph
+from compose_viz import __app_name__, __version__, analysis, diff, discovery
+from compose_viz.graph import DEFAULT_MAX_NODES, Graph, highlight_path
+from compose_viz.models.compose import Compose
+from compose_viz.models.detail_levels import DetailLevels
+from compose_viz.models.layout_engines import LayoutEngines
+from compose_viz.models.overlay import Overlay
+from compose_viz.models.resource_metrics import ResourceMetrics
+from compose_viz.models.vertex import vertex_id
 from compose_viz.models.viz_formats import VizFormats
+from compose_viz.pages import render_pages
 from compose_viz.parser import Parser
+from compose_viz.server import MAX_BODY_SIZE, RenderServer, RenderService
+
+DEFAULT_COMMAND = "render"
+STREAM = "-"
+
+
+class DefaultCommandGroup(TyperGroup):
+    # keeps `cpv [OPTIONS] INPUT_PATH` working next to the subcommands
+    def parse_args(self, ctx: click.Context, args: List[str]) -> List[str]:
+        if args and args[0] not in self.commands and args[0] not in ctx.help_option_names + ["--version", "-v"]:
+            args.insert(0, DEFAULT_COMMAND)
+        return super().parse_args(ctx, args)
+
 
 app = typer.Typer(
-    invoke_without_command=True,
+    cls=DefaultCommandGroup,
     no_args_is_help=True,
-    subcommand_metavar="",
     add_completion=False,
 )
 
@@ -21,52 +44,589 @@ def _version_callback(value: bool) -> None:
         raise typer.Exit()
 
 
+def _input_paths_argument(help: str) -> Any:
+    return typer.Argument(..., help=f"{help}, later files override earlier ones. `-` reads a single file from stdin.")
+
+
+def _output_filename_option(
+    default: Optional[str],
+    help: str = "Output filename for the generated visualization file, `-` writes to stdout.",
+) -> Any:
+    return typer.Option(default, "--output-filename", "-o", help=help)
+
+
+def _format_option() -> Any:
+    return typer.Option("png", "--format", "-m", help="Output format for the generated visualization file.")
+
+
+def _engine_option(
+    default: str = "auto",
+    help: str = "Graphviz layout engine, `auto` picks one from the size of the graph.",
+) -> Any:
+    return typer.Option(default, "--engine", "-e", help=help)
+
+
+def _layout_timeout_option() -> Any:
+    return typer.Option(
+        None, "--layout-timeout", help="Abort a layout after this many seconds and retry with faster settings."
+    )
+
+
+def _legend_option() -> Any:
+    return typer.Option(
+        False, "--legend", "-l", help="Write a legend next to the visualization, as OUTPUT_FILENAME-legend."
+    )
+
+
+def _detail_option() -> Any:
+    return typer.Option(
+        "full", "--detail", "-d", help="Level of detail, hidden attributes are moved into the tooltips of the services."
+    )
+
+
+def _max_nodes_option() -> Any:
+    return typer.Option(
+        DEFAULT_MAX_NODES,
+        "--max-nodes",
+        help="Lower the level of detail until the graph has at most this many nodes, 0 disables it.",
+    )
+
+
+def _keep_parallel_edges_option() -> Any:
+    return typer.Option(
+        False,
+        "--keep-parallel-edges",
+        help="Draw one edge per mount or port, instead of merging parallel edges into one labelled edge.",
+    )
+
+
 @app.callback()
 def compose_viz(
-    input_path: str,
-    output_filename: str = typer.Option(
-        "compose-viz",
-        "--output-filename",
-        "-o",
-        help="Output filename for the generated visualization file.",
-    ),
-    format: VizFormats = typer.Option(
-        "png",
-        "--format",
-        "-m",
-        help="Output format for the generated visualization file.",
+    _: Optional[bool] = typer.Option(
+        None,
+        "--version",
+        "-v",
+        help="Show the version of compose-viz.",
+        callback=_version_callback,
+        is_eager=True,
     ),
+) -> None:
+    pass
+
+
+@app.command(help="Render a compose file, the default command.")
+def render(
+    input_paths: List[str] = _input_paths_argument("Compose files to visualize"),
+    output_filename: str = _output_filename_option("compose-viz"),
+    format: VizFormats = _format_option(),
     root_service: str = typer.Option(
         None,
         "--root-service",
         "-r",
         help="Root of the service tree (convenient for large compose yamls)",
     ),
-    include_legend: bool = typer.Option(
+    include_legend: bool = _legend_option(),
+    detail: DetailLevels = _detail_option(),
+    max_nodes: int = _max_nodes_option(),
+    engine: LayoutEngines = _engine_option(),
+    layout_timeout: Optional[float] = _layout_timeout_option(),
+    keep_parallel_edges: bool = _keep_parallel_edges_option(),
+    fingerprint: bool = typer.Option(
         False,
-        "--legend",
-        "-l",
-        help="Include a legend in the visualization.",
+        "--fingerprint",
+        help="Print a fingerprint of the graph, usable as a cache key, instead of rendering it.",
     ),
-    _: Optional[bool] = typer.Option(
+    schema_path: Optional[str] = typer.Option(
         None,
-        "--version",
-        "-v",
-        help="Show the version of compose-viz.",
-        callback=_version_callback,
-        is_eager=True,
+        "--schema",
+        help="Check the compose files against this JSON schema first, for the exact errors of compose-spec. "
+        "An extra pass before parsing, needs compose-viz[schema].",
+    ),
+    split_networks: bool = typer.Option(
+        False,
+        "--split-networks",
+        help="Render one page per network in parallel, plus an index page linking them.",
+    ),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        help="Number of worker processes used with --split-networks. [default: number of CPUs]",
     ),
 ) -> None:
-    parser = Parser()
-    compose = parser.parse(input_path, root_service=root_service)
+    # `-` streams the compose file from stdin and the rendered output to stdout
+    to_stdout = output_filename == STREAM
+    if to_stdout and split_networks:
+        raise typer.BadParameter("Split networks are written to several files, they cannot be streamed to stdout.")
+    if to_stdout and include_legend:
+        raise typer.BadParameter("The legend is written to a separate file, it cannot be streamed to stdout.")
+
+    input_path = ", ".join(input_paths)
+    compose = _parse_inputs(input_paths, root_service, schema_path)
+
+    if fingerprint:
+        graph = Graph(
+            compose,
+            output_filename,
+            include_legend,
+            detail=detail.value,
+            max_nodes=max_nodes or None,
+            coalesce_edges=not keep_parallel_edges,
+        )
+        typer.echo(graph.fingerprint())
+        raise typer.Exit()
 
     if compose:
-        typer.echo(f"Successfully parsed {input_path}")
+        typer.echo(f"Successfully parsed {input_path}", err=to_stdout)
+
+    if split_networks:
+        render_pages(
+            compose,
+            output_filename,
+            format.value,
+            include_legend=include_legend,
+            detail=detail.value,
+            max_nodes=max_nodes or None,
+            engine=engine.value,
+            layout_timeout=layout_timeout,
+            max_workers=jobs,
+            coalesce_edges=not keep_parallel_edges,
+        )
+    else:
+        _render_graph(
+            compose,
+            output_filename,
+            format,
+            engine,
+            layout_timeout,
+            include_legend=include_legend,
+            detail=detail,
+            max_nodes=max_nodes,
+            coalesce_edges=not keep_parallel_edges,
+        )
+
+    raise typer.Exit()
+
+
+@app.command(help="Find every compose file below a directory and render them as one graph.")
+def discover(
+    root: str = typer.Argument(".", help="Directory to search for compose files."),
+    output_filename: str = _output_filename_option("compose-viz"),
+    format: VizFormats = _format_option(),
+    patterns: List[str] = typer.Option(
+        discovery.DEFAULT_PATTERNS,
+        "--pattern",
+        "-p",
+        help="Filename pattern of compose files, can be repeated.",
+    ),
+    excludes: List[str] = typer.Option(
+        [],
+        "--exclude",
+        "-x",
+        help="Path pattern, relative to the directory, to skip, can be repeated.",
+    ),
+    no_gitignore: bool = typer.Option(
+        False,
+        "--no-gitignore",
+        help="Also search the paths ignored by .gitignore files.",
+    ),
+    include_legend: bool = _legend_option(),
+    detail: DetailLevels = _detail_option(),
+    max_nodes: int = _max_nodes_option(),
+    engine: LayoutEngines = _engine_option(),
+    layout_timeout: Optional[float] = _layout_timeout_option(),
+    keep_parallel_edges: bool = _keep_parallel_edges_option(),
+    jobs: Optional[int] = typer.Option(
+        None,
+        "--jobs",
+        "-j",
+        help="Number of worker processes parsing the compose files. [default: number of CPUs]",
+    ),
+) -> None:
+    to_stdout = output_filename == STREAM
+    if to_stdout and include_legend:
+        raise typer.BadParameter("The legend is written to a separate file, it cannot be streamed to stdout.")
+
+    files = discovery.find_compose_files(root, patterns=patterns, excludes=excludes, gitignore=not no_gitignore)
+    projects = discovery.group_projects(root, files)
+    if not projects:
+        typer.echo(f"No compose files found in {root}", err=True)
+        raise typer.Exit(code=1)
 
-    Graph(compose, output_filename, include_legend).render(format)
+    composes, errors = discovery.parse_projects(projects, max_workers=jobs)
+    for project, error in errors.items():
+        typer.echo(f"Skipped {project}: {error}", err=True)
+    if not composes:
+        raise typer.Exit(code=1)
+    typer.echo(f"Successfully parsed {len(composes)} projects in {root}", err=to_stdout)
+
+    compose = discovery.aggregate(root, projects, composes)
+    _render_graph(
+        compose,
+        output_filename,
+        format,
+        engine,
+        layout_timeout,
+        include_legend=include_legend,
+        detail=detail,
+        max_nodes=max_nodes,
+        coalesce_edges=not keep_parallel_edges,
+    )
 
     raise typer.Exit()
 
 
+@app.command("diff", help="Render the services changed between two compose files, next to their direct neighbors.")
+def diff_files(
+    old_path: str = typer.Argument(..., help="Compose file before the change."),
+    new_path: str = typer.Argument(..., help="Compose file after the change."),
+    output_filename: str = _output_filename_option("compose-viz-diff"),
+    format: VizFormats = _format_option(),
+    engine: LayoutEngines = _engine_option(),
+    layout_timeout: Optional[float] = _layout_timeout_option(),
+) -> None:
+    to_stdout = output_filename == STREAM
+
+    parser = Parser()
+    compose, changes = diff.diff(parser.parse(old_path), parser.parse(new_path))
+
+    counts = {change: list(changes.values()).count(change) for change in diff.CHANGES}
+    typer.echo(", ".join(f"{count} {change}" for change, count in counts.items()), err=to_stdout)
+    if not changes:
+        raise typer.Exit()
+
+    _render_graph(compose, output_filename, format, engine, layout_timeout, overlay=Overlay(changes=changes))
+
+    raise typer.Exit()
+
+
+@app.command(help="Report structural statistics of a compose file, without rendering it.")
+def stats(
+    input_paths: List[str] = _input_paths_argument("Compose files to analyze"),
+    as_json: bool = typer.Option(
+        False,
+        "--json",
+        help="Print the full statistics as JSON.",
+    ),
+    top: int = typer.Option(
+        analysis.DEFAULT_TOP,
+        "--top",
+        help="Number of services, networks and volumes listed in each ranking.",
+    ),
+    fail_on_cycles: bool = typer.Option(
+        False,
+        "--fail-on-cycles",
+        help="Exit with code 1 when services depend on each other in a cycle.",
+    ),
+) -> None:
+    report = analysis.compute_stats(_parse_inputs(input_paths, None))
+
+    if as_json:
+        typer.echo(json.dumps(report, indent=2))
+    else:
+        typer.echo(analysis.format_stats(report, top=top))
+
+    raise typer.Exit(code=1 if fail_on_cycles and report["cycles"] else 0)
+
+
+@app.command(help="List the waves in which services start in parallel, from their depends_on conditions.")
+def waves(
+    input_paths: List[str] = _input_paths_argument("Compose files to analyze"),
+    as_json: bool = typer.Option(
+        False,
+        "--json",
+        help="Print the waves as JSON.",
+    ),
+    output_filename: Optional[str] = _output_filename_option(
+        None, help="Also render the graph with one row per wave to this file, `-` writes to stdout."
+    ),
+    format: VizFormats = _format_option(),
+    engine: LayoutEngines = _engine_option("dot", help="Graphviz layout engine, rows are only kept by `dot`."),
+    layout_timeout: Optional[float] = _layout_timeout_option(),
+) -> None:
+    compose = _parse_inputs(input_paths, None)
+    report = analysis.start_waves(compose)
+
+    to_stdout = output_filename == STREAM
+    if as_json:
+        typer.echo(json.dumps(report, indent=2), err=to_stdout)
+    else:
+        typer.echo(analysis.format_waves(report), err=to_stdout)
+
+    if output_filename is not None:
+        _render_graph(compose, output_filename, format, engine, layout_timeout, overlay=Overlay(ranks=report["waves"]))
+
+    raise typer.Exit()
+
+
+@app.command(help="Estimate the time until each service is ready from its healthcheck and depends_on conditions.")
+def startup(
+    input_paths: List[str] = _input_paths_argument("Compose files to analyze"),
+    as_json: bool = typer.Option(
+        False,
+        "--json",
+        help="Print the estimates as JSON.",
+    ),
+    output_filename: Optional[str] = _output_filename_option(
+        None, help="Also render the graph with the critical path highlighted to this file, `-` writes to stdout."
+    ),
+    format: VizFormats = _format_option(),
+    engine: LayoutEngines = _engine_option(),
+    layout_timeout: Optional[float] = _layout_timeout_option(),
+) -> None:
+    compose = _parse_inputs(input_paths, None)
+    report = analysis.startup_times(compose)
+
+    to_stdout = output_filename == STREAM
+    if as_json:
+        typer.echo(json.dumps(report, indent=2), err=to_stdout)
+    else:
+        typer.echo(analysis.format_startup(report), err=to_stdout)
+
+    if output_filename is not None:
+        highlights, edge_highlights = highlight_path(report["critical_path"], "critical")
+        _render_graph(
+            compose,
+            output_filename,
+            format,
+            engine,
+            layout_timeout,
+            overlay=Overlay(highlights=highlights, edge_highlights=edge_highlights),
+        )
+
+    raise typer.Exit()
+
+
+@app.command(help="Sum up the cpus, memory and pids reserved and limited by deploy.resources, per network and profile.")
+def resources(
+    input_paths: List[str] = _input_paths_argument("Compose files to analyze"),
+    as_json: bool = typer.Option(
+        False,
+        "--json",
+        help="Print the totals of every service, network, profile and the project as JSON.",
+    ),
+    output_filename: Optional[str] = _output_filename_option(
+        None, help="Also render the graph with services filled by their resources to this file, `-` writes to stdout."
+    ),
+    heat: ResourceMetrics = typer.Option(
+        "memory",
+        "--heat",
+        help="Resource which the fill of the services in the rendered graph is based on.",
+    ),
+    format: VizFormats = _format_option(),
+    engine: LayoutEngines = _engine_option(),
+    layout_timeout: Optional[float] = _layout_timeout_option(),
+) -> None:
+    compose = _parse_inputs(input_paths, None)
+    budget = analysis.resource_budget(compose)
+
+    to_stdout = output_filename == STREAM
+    if as_json:
+        typer.echo(json.dumps(budget, indent=2), err=to_stdout)
+    else:
+        typer.echo(analysis.format_budget(budget), err=to_stdout)
+
+    if output_filename is not None:
+        service_heat = analysis.resource_heat(budget, heat.value)
+        _render_graph(
+            compose,
+            output_filename,
+            format,
+            engine,
+            layout_timeout,
+            overlay=Overlay(heat={vertex_id("service", name): value for name, value in service_heat.items()}),
+        )
+
+    raise typer.Exit()
+
+
+@app.command(help="Find services publishing the same or overlapping host ports.")
+def ports(
+    input_paths: List[str] = _input_paths_argument("Compose files to analyze"),
+    as_json: bool = typer.Option(
+        False,
+        "--json",
+        help="Print the conflicts as JSON.",
+    ),
+    fail_on_conflicts: bool = typer.Option(
+        False,
+        "--fail-on-conflicts",
+        help="Exit with code 1 when host ports conflict or overlap.",
+    ),
+    output_filename: Optional[str] = _output_filename_option(
+        None, help="Also render the graph with conflicting ports highlighted to this file, `-` writes to stdout."
+    ),
+    format: VizFormats = _format_option(),
+    engine: LayoutEngines = _engine_option(),
+    layout_timeout: Optional[float] = _layout_timeout_option(),
+) -> None:
+    compose = _parse_inputs(input_paths, None)
+    conflicts = analysis.port_conflicts(compose)
+
+    to_stdout = output_filename == STREAM
+    if as_json:
+        typer.echo(json.dumps(conflicts, indent=2), err=to_stdout)
+    else:
+        typer.echo(analysis.format_conflicts(conflicts), err=to_stdout)
+
+    if output_filename is not None:
+        highlights: Dict[str, str] = {}
+        edge_highlights: Dict[Tuple[str, str], str] = {}
+        for conflict in conflicts:
+            for service, host_port in zip(conflict["services"], conflict["host_ports"]):
+                highlights[vertex_id("service", service)] = "conflict"
+                highlights[vertex_id("port", host_port)] = "conflict"
+                edge_highlights[(vertex_id("port", host_port), vertex_id("service", service))] = "conflict"
+        _render_graph(
+            compose,
+            output_filename,
+            format,
+            engine,
+            layout_timeout,
+            overlay=Overlay(highlights=highlights, edge_highlights=edge_highlights),
+        )
+
+    raise typer.Exit(code=1 if fail_on_conflicts and conflicts else 0)
+
+
+@app.command(help="Find volumes and bind mounts shared by several services, and tmpfs mounts.")
+def volumes(
+    input_paths: List[str] = _input_paths_argument("Compose files to analyze"),
+    as_json: bool = typer.Option(
+        False,
+        "--json",
+        help="Print the shared volumes as JSON.",
+    ),
+    output_filename: Optional[str] = _output_filename_option(
+        None, help="Also render the graph with the shared volumes highlighted to this file, `-` writes to stdout."
+    ),
+    contention_only: bool = typer.Option(
+        False,
+        "--contention-only",
+        help="Render only the shared volumes and the services mounting them.",
+    ),
+    format: VizFormats = _format_option(),
+    engine: LayoutEngines = _engine_option(),
+    layout_timeout: Optional[float] = _layout_timeout_option(),
+) -> None:
+    compose = _parse_inputs(input_paths, None)
+    contention = analysis.volume_contention(compose)
+
+    to_stdout = output_filename == STREAM
+    if as_json:
+        typer.echo(json.dumps(contention, indent=2), err=to_stdout)
+    else:
+        typer.echo(analysis.format_contention(contention), err=to_stdout)
+
+    if output_filename is not None:
+        sources = analysis.contended_sources(contention)
+        if contention_only:
+            compose = analysis.contention_subgraph(compose, contention)
+            if not compose.services:
+                raise typer.Exit()
+        _render_graph(
+            compose,
+            output_filename,
+            format,
+            engine,
+            layout_timeout,
+            overlay=Overlay(highlights={vertex_id("volume", source): "contention" for source in sources}),
+        )
+
+    raise typer.Exit()
+
+
+def _parse_inputs(input_paths: List[str], root_service: Optional[str], schema_path: Optional[str] = None) -> Compose:
+    if STREAM in input_paths and len(input_paths) > 1:
+        raise typer.BadParameter("Only a single compose file can be read from stdin.")
+
+    parser = Parser(schema_path=schema_path)
+    if input_paths == [STREAM]:
+        return parser.parse_string(
+            typer.get_text_stream("stdin").read(), root_service=root_service, file_path="<stdin>"
+        )
+    return parser.parse(input_paths, root_service=root_service)
+
+
+def _render_graph(
+    compose: Compose,
+    output_filename: str,
+    format: VizFormats,
+    engine: LayoutEngines,
+    layout_timeout: Optional[float],
+    include_legend: bool = False,
+    detail: DetailLevels = DetailLevels.full,
+    max_nodes: int = 0,
+    coalesce_edges: bool = True,
+    overlay: Optional[Overlay] = None,
+) -> None:
+    to_stdout = output_filename == STREAM
+    graph = Graph(
+        compose,
+        output_filename,
+        include_legend,
+        detail=detail.value,
+        max_nodes=max_nodes or None,
+        coalesce_edges=coalesce_edges,
+        overlay=overlay,
+    )
+    if to_stdout:
+        stdout = typer.get_binary_stream("stdout")
+        stdout.write(graph.pipe(format.value, engine=engine.value, layout_timeout=layout_timeout))
+        stdout.flush()
+    else:
+        graph.render(format.value, engine=engine.value, layout_timeout=layout_timeout)
+
+    if graph.detail != detail.value:
+        typer.echo(f"Graph exceeds {max_nodes} nodes, rendered with detail level '{graph.detail}'", err=to_stdout)
+
+
+@app.command(help="Serve rendered compose files over HTTP, keeping parsed files and layouts cached.")
+def serve(
+    host: str = typer.Option(
+        "127.0.0.1",
+        "--host",
+        help="Address to listen on.",
+    ),
+    port: int = typer.Option(
+        8000,
+        "--port",
+        "-p",
+        help="Port to listen on.",
+    ),
+    workers: int = typer.Option(
+        os.cpu_count() or 1,
+        "--workers",
+        "-w",
+        help="Maximum number of concurrent graphviz processes.",
+    ),
+    cache_size: int = typer.Option(
+        128,
+        "--cache-size",
+        help="Number of parsed files and rendered layouts kept in memory.",
+    ),
+    layout_timeout: Optional[float] = _layout_timeout_option(),
+    max_body_size: int = typer.Option(
+        MAX_BODY_SIZE,
+        "--max-body-size",
+        help="Reject posted compose files larger than this many bytes.",
+    ),
+) -> None:
+    server = RenderServer(
+        host,
+        port,
+        RenderService(workers, cache_size=cache_size, layout_timeout=layout_timeout),
+        max_body_size=max_body_size,
+    )
+    typer.echo(f"Serving on http://{host}:{server.server_port}, POST compose files to /render?format=svg")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
 def start_cli() -> None:
     app(prog_name="cpv")
@@ -0,0 +1,79 @@
+import hashlib
+import json
+from enum import Enum
+from typing import Any, Dict, Set, Tuple
+
+from compose_viz.models.compose import Compose
+from compose_viz.models.service import Service
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+CHANGES = [ADDED, REMOVED, CHANGED]
+
+
+def canonical(value: Any) -> Any:
+    # models are plain classes holding their fields in private attributes, every field takes part
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, dict):
+        return {str(key): canonical(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        # the sequences of a service are sets in practice, their order is not significant
+        return sorted((canonical(item) for item in value), key=lambda item: json.dumps(item, sort_keys=True))
+    if hasattr(value, "__dict__"):
+        return {name.lstrip("_"): canonical(item) for name, item in vars(value).items()}
+    return value
+
+
+def service_fingerprint(service: Service) -> str:
+    content = json.dumps(canonical(service), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def neighbors(compose: Compose) -> Dict[str, Set[str]]:
+    adjacent: Dict[str, Set[str]] = {service.name: set() for service in compose.services}
+    for service in compose.services:
+        targets = service.depends_on + [link.split(":", 1)[0] for link in service.links]
+        if service.extends is not None:
+            targets.append(service.extends.service_name)
+
+        for target in targets:
+            adjacent[service.name].add(target)
+            adjacent.setdefault(target, set()).add(service.name)
+    return adjacent
+
+
+def compare(old: Compose, new: Compose) -> Dict[str, str]:
+    old_fingerprints = {service.name: service_fingerprint(service) for service in old.services}
+    new_fingerprints = {service.name: service_fingerprint(service) for service in new.services}
+
+    changes: Dict[str, str] = {}
+    for name, fingerprint in new_fingerprints.items():
+        if name not in old_fingerprints:
+            changes[name] = ADDED
+        elif old_fingerprints[name] != fingerprint:
+            changes[name] = CHANGED
+    for name in old_fingerprints:
+        if name not in new_fingerprints:
+            changes[name] = REMOVED
+    return changes
+
+
+def diff(old: Compose, new: Compose) -> Tuple[Compose, Dict[str, str]]:
+    # only the changed services and their direct neighbors are kept, on both sides of the change
+    changes = compare(old, new)
+    new_services = {service.name: service for service in new.services}
+    old_neighbors = neighbors(old)
+    new_neighbors = neighbors(new)
+
+    shown: Set[str] = set(changes)
+    for name, change in changes.items():
+        if change != REMOVED:
+            shown.update(new_neighbors.get(name, set()))
+        if change != ADDED:
+            shown.update(old_neighbors.get(name, set()))
+
+    services = [service for service in new.services if service.name in shown]
+    services.extend(service for service in old.services if service.name in shown and service.name not in new_services)
+    return Compose(services=services), changes
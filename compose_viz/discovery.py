@@ -0,0 +1,213 @@
+import fnmatch
+import os
+import posixpath
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from compose_viz.models.compose import Compose
+from compose_viz.models.extends import Extends
+from compose_viz.models.service import Service
+from compose_viz.models.volume import Volume, VolumeType
+from compose_viz.parser import Parser
+
+DEFAULT_PATTERNS = [
+    "compose.yml",
+    "compose.yaml",
+    "compose.override.yml",
+    "compose.override.yaml",
+    "docker-compose*.yml",
+    "docker-compose*.yaml",
+]
+OVERRIDE_SUFFIX = re.compile(r"\.override(\.ya?ml)$")
+
+# (directory of the .gitignore, pattern, negated, directory only, anchored)
+IgnoreRule = Tuple[str, str, bool, bool, bool]
+
+
+def load_gitignore(directory: str, relative_directory: str) -> List[IgnoreRule]:
+    rules: List[IgnoreRule] = []
+    path = os.path.join(directory, ".gitignore")
+    if not os.path.isfile(path):
+        return rules
+
+    with open(path, "r") as gitignore:
+        for line in gitignore:
+            line = line.rstrip("\n").rstrip()
+            if not line or line.startswith("#"):
+                continue
+
+            negated = line.startswith("!")
+            line = line[1:] if negated else line
+            directory_only = line.endswith("/")
+            line = line.rstrip("/")
+            # a slash at the beginning or in the middle anchors the pattern to the directory of the .gitignore
+            anchored = "/" in line
+            rules.append((relative_directory, line.lstrip("/"), negated, directory_only, anchored))
+
+    return rules
+
+
+def is_ignored(relative_path: str, is_directory: bool, rules: List[IgnoreRule]) -> bool:
+    ignored = False
+    for base, pattern, negated, directory_only, anchored in rules:
+        if directory_only and not is_directory:
+            continue
+        if base and not relative_path.startswith(f"{base}/"):
+            continue
+
+        path = posixpath.relpath(relative_path, base) if base else relative_path
+        target = path if anchored else posixpath.basename(path)
+        if fnmatch.fnmatchcase(target, pattern):
+            ignored = not negated
+        elif pattern.startswith("**/") and fnmatch.fnmatchcase(path, pattern[3:]):
+            ignored = not negated
+
+    return ignored
+
+
+def find_compose_files(
+    root: str,
+    patterns: Sequence[str] = DEFAULT_PATTERNS,
+    excludes: Sequence[str] = [],
+    gitignore: bool = True,
+) -> List[str]:
+    found: List[str] = []
+    rules: Dict[str, List[IgnoreRule]] = {}
+
+    for directory, directories, files in os.walk(root):
+        relative_directory = os.path.relpath(directory, root).replace(os.sep, "/")
+        relative_directory = "" if relative_directory == "." else relative_directory
+
+        directory_rules = rules.pop(relative_directory, [])
+        if gitignore:
+            directory_rules = directory_rules + load_gitignore(directory, relative_directory)
+
+        def skipped(name: str, is_directory: bool) -> bool:
+            path = posixpath.join(relative_directory, name)
+            if any(fnmatch.fnmatchcase(path, exclude) for exclude in excludes):
+                return True
+            return is_ignored(path, is_directory, directory_rules)
+
+        # pruned in place, so that ignored directories are never walked into
+        directories[:] = sorted(name for name in directories if name != ".git" and not skipped(name, True))
+        for name in directories:
+            rules[posixpath.join(relative_directory, name)] = directory_rules
+
+        for name in sorted(files):
+            if any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns) and not skipped(name, False):
+                found.append(os.path.join(directory, name))
+
+    return found
+
+
+def group_projects(root: str, files: List[str]) -> Dict[str, List[str]]:
+    # override files are merged into their base file, like compose does with docker-compose.override.yml
+    found = set(files)
+    bases: Dict[str, List[str]] = {}
+    overrides: List[Tuple[str, str]] = []
+    for path in files:
+        base = OVERRIDE_SUFFIX.sub(r"\1", path)
+        if base != path and base in found:
+            overrides.append((base, path))
+        else:
+            bases[path] = [path]
+    for base, path in overrides:
+        bases[base].append(path)
+
+    per_directory: Dict[str, int] = {}
+    for path in bases:
+        per_directory[os.path.dirname(path)] = per_directory.get(os.path.dirname(path), 0) + 1
+
+    projects: Dict[str, List[str]] = {}
+    for path, project_files in bases.items():
+        directory = os.path.relpath(os.path.dirname(path), root).replace(os.sep, "/")
+        project = os.path.basename(os.path.abspath(root)) if directory == "." else directory
+        if per_directory[os.path.dirname(path)] > 1:
+            project = f"{project}/{os.path.basename(path)}"
+        projects[project] = project_files
+
+    return projects
+
+
+def _parse_project(file_paths: List[str]) -> Compose:
+    return Parser().parse(file_paths)
+
+
+def parse_projects(
+    projects: Dict[str, List[str]], max_workers: Optional[int] = None
+) -> Tuple[Dict[str, Compose], Dict[str, str]]:
+    composes: Dict[str, Compose] = {}
+    errors: Dict[str, str] = {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {project: executor.submit(_parse_project, file_paths) for project, file_paths in projects.items()}
+        for project, future in futures.items():
+            try:
+                composes[project] = future.result()
+            except Exception as e:
+                # a broken project is reported and skipped, whatever the parser failed with
+                errors[project] = str(e) or type(e).__name__
+
+    return composes, errors
+
+
+def _namespace_volume(volume: Volume, project: str, directory: str, external_volumes: Dict[str, str]) -> Volume:
+    source = volume.source
+    if volume.type == VolumeType.bind and source.startswith("."):
+        # relative bind mounts of different projects are unified by their path from the root
+        source = posixpath.normpath(posixpath.join(directory, source))
+    elif volume.type == VolumeType.volume and source:
+        source = external_volumes.get(source, f"{project}/{source}")
+    return Volume(source=source, target=volume.target, type=volume.type, access_mode=volume.access_mode)
+
+
+def namespace(compose: Compose, project: str, directory: str) -> List[Service]:
+    def scoped(name: str) -> str:
+        return f"{project}/{name}"
+
+    services: List[Service] = []
+    for service in compose.services:
+        extends = service.extends
+        if extends is not None:
+            extends = Extends(service_name=scoped(extends.service_name), from_file=extends.from_file)
+
+        services.append(
+            Service(
+                name=scoped(service.name),
+                image=service.image,
+                ports=service.ports,
+                networks=[compose.external_networks.get(network, scoped(network)) for network in service.networks],
+                volumes=[
+                    _namespace_volume(volume, project, directory, compose.external_volumes)
+                    for volume in service.volumes
+                ],
+                depends_on=[scoped(depends_on) for depends_on in service.depends_on],
+                links=[scoped(link) for link in service.links],
+                extends=extends,
+                cgroup_parent=service.cgroup_parent,
+                container_name=service.container_name,
+                devices=service.devices,
+                env_file=[posixpath.normpath(posixpath.join(directory, env_file)) for env_file in service.env_file],
+                expose=service.expose,
+                profiles=service.profiles,
+                depends_on_conditions={
+                    scoped(depends_on): condition for depends_on, condition in service.depends_on_conditions.items()
+                },
+                healthcheck=service.healthcheck,
+                resources=service.resources,
+            )
+        )
+
+    return services
+
+
+def aggregate(root: str, projects: Dict[str, List[str]], composes: Dict[str, Compose]) -> Compose:
+    # services and project scoped resources are prefixed with their project,
+    # external networks and volumes keep their engine name and are shared across projects
+    services: List[Service] = []
+    for project, compose in composes.items():
+        directory = os.path.relpath(os.path.dirname(projects[project][0]), root).replace(os.sep, "/")
+        services.extend(namespace(compose, project, directory))
+
+    return Compose(services=services)
@@ -0,0 +1,236 @@
+import csv
+import io
+import json
+import xml.etree.ElementTree as ET
+from typing import Callable, Dict, List
+
+from compose_viz.models.edge import Edge
+from compose_viz.models.vertex import Vertex
+
+
+def complete_vertices(vertices: List[Vertex], edges: List[Edge]) -> List[Vertex]:
+    # edges may point to services which are not declared in the compose file, e.g. extended ones
+    ids = {vertex.id for vertex in vertices}
+    implicit: List[Vertex] = []
+    for edge in edges:
+        for id in (edge.head, edge.tail):
+            if id not in ids:
+                ids.add(id)
+                implicit.append(Vertex(id.split(":", 1)[1], "service"))
+    return vertices + implicit
+
+
+def to_json_adjacency(vertices: List[Vertex], edges: List[Edge]) -> str:
+    # follows the layout of networkx's `adjacency_data`, so it can be loaded with `adjacency_graph`
+    vertices = complete_vertices(vertices, edges)
+
+    adjacency: Dict[str, List[dict]] = {vertex.id: [] for vertex in vertices}
+    for edge in edges:
+        neighbors = adjacency[edge.head]
+        key = sum(1 for neighbor in neighbors if neighbor["id"] == edge.tail)
+        neighbors.append({"id": edge.tail, "key": key, "type": edge.type, "label": edge.label})
+
+    nodes = []
+    for vertex in vertices:
+        node = {"id": vertex.id, "type": vertex.type, "label": vertex.label or vertex.name}
+        if vertex.tooltip:
+            node["tooltip"] = vertex.tooltip
+        nodes.append(node)
+
+    return json.dumps(
+        {
+            "directed": True,
+            "multigraph": True,
+            "graph": {},
+            "nodes": nodes,
+            "adjacency": [adjacency[vertex.id] for vertex in vertices],
+        },
+        indent=2,
+    )
+
+
+def to_graphml(vertices: List[Vertex], edges: List[Edge]) -> str:
+    vertices = complete_vertices(vertices, edges)
+
+    graphml = ET.Element("graphml", xmlns="http://graphml.graphdrawing.org/xmlns")
+    for key_id, domain, name in [
+        ("node_type", "node", "type"),
+        ("node_label", "node", "label"),
+        ("node_tooltip", "node", "tooltip"),
+        ("edge_type", "edge", "type"),
+        ("edge_label", "edge", "label"),
+    ]:
+        ET.SubElement(graphml, "key", {"id": key_id, "for": domain, "attr.name": name, "attr.type": "string"})
+
+    graph = ET.SubElement(graphml, "graph", id="compose", edgedefault="directed")
+    for vertex in vertices:
+        node = ET.SubElement(graph, "node", id=vertex.id)
+        ET.SubElement(node, "data", key="node_type").text = vertex.type
+        ET.SubElement(node, "data", key="node_label").text = vertex.label or vertex.name
+        if vertex.tooltip:
+            ET.SubElement(node, "data", key="node_tooltip").text = vertex.tooltip
+    for edge in edges:
+        element = ET.SubElement(graph, "edge", source=edge.head, target=edge.tail)
+        ET.SubElement(element, "data", key="edge_type").text = edge.type
+        if edge.label:
+            ET.SubElement(element, "data", key="edge_label").text = edge.label
+
+    ET.indent(graphml)
+    return ET.tostring(graphml, encoding="unicode", xml_declaration=True) + "\n"
+
+
+def to_csv(vertices: List[Vertex], edges: List[Edge]) -> str:
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["source", "target", "type", "label"])
+    for edge in edges:
+        writer.writerow([edge.head, edge.tail, edge.type, edge.label or ""])
+    return output.getvalue()
+
+
+MERMAID_SHAPES = {
+    "service": ('[["', '"]]'),
+    "reference": ('[["', '"]]'),
+    "volume": ('[("', '")]'),
+    "network": ('{{"', '"}}'),
+    "port": ('(("', '"))'),
+    "env_file": ('[/"', '"/]'),
+    "porfile": ('[\\"', '"/]'),
+    "cgroup": ('{"', '"}'),
+    "device": ('["', '"]'),
+}
+
+MERMAID_ARROWS = {
+    "exposes": "<-->",
+    "links": "-->",
+    "volumes_rw": "<-.->",
+    "volumes_ro": "-.->",
+    "depends_on": "-.->",
+    "extends": "==>",
+    "env_file": "-->",
+}
+
+
+def vertex_ids(vertices: List[Vertex]) -> Dict[str, str]:
+    return {vertex.id: f"n{index}" for index, vertex in enumerate(vertices)}
+
+
+def escape_mermaid(text: str) -> str:
+    return text.replace('"', "#quot;").replace("\n", "<br/>")
+
+
+def to_mermaid(vertices: List[Vertex], edges: List[Edge]) -> str:
+    vertices = complete_vertices(vertices, edges)
+    ids = vertex_ids(vertices)
+
+    lines = ["flowchart TB"]
+    for vertex in vertices:
+        opening, closing = MERMAID_SHAPES[vertex.type]
+        lines.append(f"    {ids[vertex.id]}{opening}{escape_mermaid(vertex.label or vertex.name)}{closing}")
+    for edge in edges:
+        label = f'|"{escape_mermaid(edge.label)}"|' if edge.label else ""
+        lines.append(f"    {ids[edge.head]} {MERMAID_ARROWS[edge.type]}{label} {ids[edge.tail]}")
+    return "\n".join(lines) + "\n"
+
+
+D2_SHAPES = {
+    "service": "rectangle",
+    "reference": "rectangle",
+    "volume": "cylinder",
+    "network": "hexagon",
+    "port": "circle",
+    "env_file": "page",
+    "porfile": "step",
+    "cgroup": "diamond",
+    "device": "stored_data",
+}
+
+D2_ARROWS = {
+    "exposes": "<->",
+    "volumes_rw": "<->",
+    "extends": "<->",
+}
+
+D2_DASHED = {"reference", "volumes_rw", "volumes_ro", "depends_on"}
+
+
+def quote_d2(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+
+
+def to_d2(vertices: List[Vertex], edges: List[Edge]) -> str:
+    vertices = complete_vertices(vertices, edges)
+    ids = vertex_ids(vertices)
+
+    lines: List[str] = []
+    for vertex in vertices:
+        style = "; style.stroke-dash: 3" if vertex.type in D2_DASHED else ""
+        lines.append(
+            f"{ids[vertex.id]}: {quote_d2(vertex.label or vertex.name)} {{shape: {D2_SHAPES[vertex.type]}{style}}}"
+        )
+    for edge in edges:
+        label = f": {quote_d2(edge.label)}" if edge.label else ""
+        style = " {style.stroke-dash: 3}" if edge.type in D2_DASHED else ""
+        lines.append(f"{ids[edge.head]} {D2_ARROWS.get(edge.type, '->')} {ids[edge.tail]}{label}{style}")
+    return "\n".join(lines) + "\n"
+
+
+PLANTUML_ELEMENTS = {
+    "service": "component",
+    "reference": "component",
+    "volume": "database",
+    "network": "cloud",
+    "port": "interface",
+    "env_file": "file",
+    "porfile": "card",
+    "cgroup": "frame",
+    "device": "storage",
+}
+
+PLANTUML_ARROWS = {
+    "exposes": "<-->",
+    "links": "-->",
+    "volumes_rw": "<..>",
+    "volumes_ro": "..>",
+    "depends_on": "..>",
+    # `base <|-- derived`, like an inheritance
+    "extends": "<|--",
+    "env_file": "-->",
+}
+
+
+def escape_plantuml(text: str) -> str:
+    return text.replace('"', "'").replace("\n", "\\n")
+
+
+def to_plantuml(vertices: List[Vertex], edges: List[Edge]) -> str:
+    vertices = complete_vertices(vertices, edges)
+    ids = vertex_ids(vertices)
+
+    lines = ["@startuml"]
+    for vertex in vertices:
+        label = escape_plantuml(vertex.label or vertex.name)
+        style = " #line.dashed" if vertex.type == "reference" else ""
+        lines.append(f'{PLANTUML_ELEMENTS[vertex.type]} "{label}" as {ids[vertex.id]}{style}')
+    for edge in edges:
+        label = f" : {escape_plantuml(edge.label)}" if edge.label else ""
+        lines.append(f"{ids[edge.head]} {PLANTUML_ARROWS[edge.type]} {ids[edge.tail]}{label}")
+    lines.append("@enduml")
+    return "\n".join(lines) + "\n"
+
+
+# formats written straight from the graph model, without running graphviz
+EXPORTERS: Dict[str, Callable[[List[Vertex], List[Edge]], str]] = {
+    "csv": to_csv,
+    "d2": to_d2,
+    "graphml": to_graphml,
+    "json-adjacency": to_json_adjacency,
+    "mermaid": to_mermaid,
+    "plantuml": to_plantuml,
+}
+
+EXTENSIONS = {
+    "json-adjacency": "json",
+    "mermaid": "mmd",
+    "plantuml": "puml",
+}
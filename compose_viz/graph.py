@@ -1,195 +1,391 @@
-from typing import Optional
+import asyncio
+import hashlib
+import json
+from concurrent.futures import Executor
+from typing import Dict, List, Optional, Set, Tuple
 
 import graphviz
 
+from compose_viz import layout, legend
+from compose_viz.exporters import EXPORTERS, EXTENSIONS
 from compose_viz.models.compose import Compose
-from compose_viz.models.port import AppProtocol, Protocol
-
-
-def apply_vertex_style(type: str) -> dict:
-    style = {
-        "service": {
-            "shape": "component",
-        },
-        "volume": {
-            "shape": "cylinder",
-        },
-        "network": {
-            "shape": "pentagon",
-        },
-        "port": {
-            "shape": "circle",
-        },
-        "env_file": {
-            "shape": "tab",
-        },
-        "porfile": {
-            "shape": "invhouse",
-        },
-        "cgroup": {
-            "shape": "diamond",
-        },
-        "device": {
-            "shape": "box3d",
-        },
-    }
+from compose_viz.models.detail_levels import DetailLevels
+from compose_viz.models.edge import Edge
+from compose_viz.models.layout_engines import LayoutEngines
+from compose_viz.models.overlay import Overlay
+from compose_viz.models.port import AppProtocol, Port, Protocol
+from compose_viz.models.service import Service
+from compose_viz.models.vertex import Vertex, vertex_id
+from compose_viz.styles import CHANGE_STYLES, EDGE_STYLES, HIGHLIGHT_STYLES, VERTEX_STYLES, heat_style
+
+# above this many nodes the level of detail is lowered automatically by the CLI
+DEFAULT_MAX_NODES = 1000
 
-    return style[type]
-
-
-def apply_edge_style(type: str) -> dict:
-    style = {
-        "exposes": {
-            "style": "solid",
-            "dir": "both",
-        },
-        "links": {
-            "style": "solid",
-        },
-        "volumes_rw": {
-            "style": "dashed",
-            "dir": "both",
-        },
-        "volumes_ro": {
-            "style": "dashed",
-        },
-        "depends_on": {
-            "style": "dotted",
-        },
-        "extends": {
-            "dir": "both",
-            "arrowhead": "inv",
-            "arrowtail": "dot",
-        },
-        "env_file": {
-            "style": "solid",
-        },
+
+def highlight_path(names: List[str], highlight: str) -> Tuple[Dict[str, str], Dict[Tuple[str, str], str]]:
+    # a chain of services from the first dependency to the last dependent, along their depends_on edges
+    vertices = {vertex_id("service", name): highlight for name in names}
+    edges = {
+        (vertex_id("service", dependent), vertex_id("service", dependency)): highlight
+        for dependency, dependent in zip(names, names[1:])
     }
+    return vertices, edges
+
 
-    return style[type]
+def port_label(port: Port) -> str:
+    return (
+        port.container_port
+        + (("/" + port.protocol) if port.protocol != Protocol.any.value else "")
+        + (("\n(" + port.app_protocol + ")") if port.app_protocol != AppProtocol.na.value else "")
+    )
 
 
 class Graph:
-    def __init__(self, compose: Compose, filename: str, include_legend: bool) -> None:
+    def __init__(
+        self,
+        compose: Compose,
+        filename: str,
+        include_legend: bool,
+        references: Optional[Dict[str, str]] = None,
+        detail: str = DetailLevels.full.value,
+        max_nodes: Optional[int] = None,
+        coalesce_edges: bool = True,
+        overlay: Optional[Overlay] = None,
+    ) -> None:
         self.dot = graphviz.Digraph()
         self.dot.attr("graph", background="#ffffff", pad="0.5", ratio="fill")
         self.compose = compose
         self.filename = filename
+        # the legend is rendered once and cached, it is written next to the graph instead of being laid out with it
+        self.include_legend = include_legend
+        # services drawn as stubs pointing to the page they are rendered on
+        self.references = references if references is not None else {}
+        self.overlay = overlay if overlay is not None else Overlay()
+        self.detail = detail
+        self.max_nodes = max_nodes
+        self.vertices: Dict[str, Vertex] = {}
+        self.edges: List[Edge] = []
+        # parallel edges of the same type are merged into one edge, labelled with all of their labels
+        self.coalesce_edges = coalesce_edges
+        self.edge_labels: Dict[Tuple[str, str, str], Tuple[int, List[str]]] = {}
+        self.built = False
+        self.emitted = False
+        # short generated DOT ids by vertex id, the readable names only appear in labels
+        self.node_ids: Dict[str, str] = {}
 
-        if include_legend:
-            self.dot.attr(rankdir="LR")
+    def add_vertex(self, name: str, type: str, lable: Optional[str] = None, tooltip: Optional[str] = None) -> str:
+        # repeated vertices update the attributes they set, like repeated node statements do
+        id = vertex_id(type, name)
+        if id in self.vertices:
+            vertex = self.vertices[id]
+            lable = lable if lable is not None else vertex.label
+            tooltip = tooltip if tooltip is not None else vertex.tooltip
+        self.vertices[id] = Vertex(name, type, lable, tooltip)
+        return id
 
-            with self.dot.subgraph(name="cluster_edge_") as edge:
-                edge.attr(label="Edge")
-                edge.node("line_0_l", style="invis")
-                edge.node("line_0_r", style="invis")
-                edge.edge("line_0_l", "line_0_r", label="exposes", **apply_edge_style("exposes"))
+    def add_edge(self, head: str, tail: str, type: str, lable: Optional[str] = None) -> None:
+        key = (head, tail, type)
+        if not self.coalesce_edges or key not in self.edge_labels:
+            self.edge_labels[key] = (len(self.edges), [lable] if lable else [])
+            self.edges.append(Edge(head, tail, type, lable))
+            return
 
-                edge.node("line_1_l", style="invis")
-                edge.node("line_1_r", style="invis")
-                edge.edge("line_1_l", "line_1_r", label="links", **apply_edge_style("links"))
+        index, labels = self.edge_labels[key]
+        if lable and lable not in labels:
+            labels.append(lable)
+            self.edges[index] = Edge(head, tail, type, "\n".join(labels))
 
-                edge.node("line_2_l", style="invis")
-                edge.node("line_2_r", style="invis")
-                edge.edge("line_2_l", "line_2_r", label="volumes_rw", **apply_edge_style("volumes_rw"))
+    def sorted_vertices(self) -> List[Vertex]:
+        return sorted(self.vertices.values(), key=lambda vertex: vertex.id)
 
-                edge.node("line_3_l", style="invis")
-                edge.node("line_3_r", style="invis")
-                edge.edge("line_3_l", "line_3_r", label="volumes_ro", **apply_edge_style("volumes_ro"))
+    def sorted_edges(self) -> List[Edge]:
+        return sorted(self.edges, key=lambda edge: (edge.head, edge.tail, edge.type, edge.label or ""))
 
-                edge.node("line_4_l", style="invis")
-                edge.node("line_4_r", style="invis")
-                edge.edge("line_4_l", "line_4_r", label="depends_on", **apply_edge_style("depends_on"))
+    def emit(self) -> None:
+        if self.emitted:
+            return
+        self.emitted = True
+        self.build()
 
-                edge.node("line_5_l", style="invis")
-                edge.node("line_5_r", style="invis")
-                edge.edge("line_5_l", "line_5_r", label="extends", **apply_edge_style("extends"))
+        # edges may point to services which are not declared in the compose file, they are drawn by name
+        sorted_vertices = self.sorted_vertices()
+        implicit = sorted({id for edge in self.edges for id in (edge.head, edge.tail) if id not in self.vertices})
+        self.node_ids = {
+            id: f"n{index}" for index, id in enumerate([vertex.id for vertex in sorted_vertices] + implicit)
+        }
 
-            with self.dot.subgraph(name="cluster_node_") as node:
-                node.attr(label="Node")
-                node.node("service", shape="component", label="Service\n(image)")
-                node.node("volume", shape="cylinder", label="Volume")
-                node.node("network", shape="pentagon", label="Network")
-                node.node("port", shape="circle", label="Port")
-                node.node("env_file", shape="tab", label="Env File")
-                node.node("profile", shape="invhouse", label="Profile")
-                node.node("cgroup", shape="diamond", label="CGroupe")
-                node.node("device", shape="box3d", label="Device")
+        # emitted in a canonical order, so that the same graph always gives the same source,
+        # grouped by type under scoped defaults, so that statements only carry their own attributes
+        vertices: Dict[str, List[Vertex]] = {}
+        for vertex in sorted_vertices:
+            vertices.setdefault(vertex.type, []).append(vertex)
+        for type, typed_vertices in sorted(vertices.items()):
+            with self.dot.subgraph() as group:
+                group.attr("node", **VERTEX_STYLES[type])
+                for vertex in typed_vertices:
+                    group.node(self.node_ids[vertex.id], vertex.label or vertex.name, **self.attributes(vertex))
 
-                node.body.append("{ rank=source;service network env_file cgroup }")
+        for id in implicit:
+            name = id.split(":", 1)[1]
+            self.dot.node(
+                self.node_ids[id],
+                name,
+                **(CHANGE_STYLES[self.overlay.changes.get(name, "unchanged")] if self.overlay.changes else {}),
+            )
 
-            self.dot.node("inv", style="invis")
-            self.dot.edge("inv", "network", style="invis")
-            self.dot.edge("port", "line_2_l", style="invis")
+        for rank in self.overlay.ranks:
+            ids = [self.node_ids[id] for id in (vertex_id("service", name) for name in rank) if id in self.node_ids]
+            if ids:
+                with self.dot.subgraph() as row:
+                    row.attr(rank="same")
+                    for id in ids:
+                        row.node(id)
 
-    def validate_name(self, name: str) -> str:
-        # graphviz does not allow ':' in node name
-        transTable = name.maketrans({":": ""})
-        return name.translate(transTable)
+        edges: Dict[str, List[Edge]] = {}
+        for edge in self.sorted_edges():
+            edges.setdefault(edge.type, []).append(edge)
+        for type, typed_edges in sorted(edges.items()):
+            with self.dot.subgraph() as group:
+                group.attr("edge", **EDGE_STYLES[type])
+                for edge in typed_edges:
+                    group.edge(
+                        self.node_ids[edge.head],
+                        self.node_ids[edge.tail],
+                        edge.label,
+                        **HIGHLIGHT_STYLES.get(self.overlay.edge_highlights.get((edge.head, edge.tail), ""), {}),
+                    )
 
-    def add_vertex(self, name: str, type: str, lable: Optional[str] = None) -> None:
-        self.dot.node(self.validate_name(name), lable, **apply_vertex_style(type))
+    def attributes(self, vertex: Vertex) -> Dict[str, str]:
+        overlay = self.overlay
+        if vertex.tooltip is None and not (overlay.changes or overlay.highlights or overlay.heat):
+            return {}
 
-    def add_edge(self, head: str, tail: str, type: str, lable: Optional[str] = None) -> None:
-        self.dot.edge(self.validate_name(head), self.validate_name(tail), lable, **apply_edge_style(type))
+        attributes: Dict[str, str] = {}
+        if vertex.id in overlay.heat:
+            attributes.update(heat_style(overlay.heat[vertex.id]))
+        if overlay.changes and vertex.type in ("service", "reference"):
+            attributes.update(CHANGE_STYLES[overlay.changes.get(vertex.name, "unchanged")])
+        if vertex.id in overlay.highlights:
+            attributes.update(HIGHLIGHT_STYLES[overlay.highlights[vertex.id]])
+        if vertex.tooltip:
+            attributes["tooltip"] = vertex.tooltip
+        return attributes
+
+    def fingerprint(self) -> str:
+        # hash of the logical graph, independent of the order of the compose file, usable as a cache key
+        self.build()
+        content = {
+            "changes": sorted(self.overlay.changes.items()),
+            "ranks": self.overlay.ranks,
+            "highlights": sorted(self.overlay.highlights.items()),
+            "edge_highlights": sorted([*edge, highlight] for edge, highlight in self.overlay.edge_highlights.items()),
+            "heat": sorted(self.overlay.heat.items()),
+            "vertices": [[vertex.id, vertex.label or "", vertex.tooltip or ""] for vertex in self.sorted_vertices()],
+            "edges": [[edge.head, edge.tail, edge.type, edge.label or ""] for edge in self.sorted_edges()],
+        }
+        return hashlib.sha256(json.dumps(content, separators=(",", ":")).encode()).hexdigest()
 
-    def render(self, format: str, cleanup: bool = True) -> None:
+    def select_engine(self, engine: str) -> str:
+        if engine == LayoutEngines.auto.value:
+            return layout.select_engine(len(self.vertices), len(self.edges))
+        return engine
+
+    def count_vertices(self, detail: str) -> int:
+        services: Set[str] = set()
+        networks: Set[str] = set()
+        attributes: Set[Tuple[str, str]] = set()
         for service in self.compose.services:
-            if service.image is not None:
+            services.add(service.name)
+            networks.update(service.networks)
+            if service.cgroup_parent is not None:
+                attributes.add(("cgroup", service.cgroup_parent))
+            attributes.update(("volume", volume.source) for volume in service.volumes)
+            attributes.update(("port", expose) for expose in service.expose)
+            attributes.update(("port", port.host_port) for port in service.ports)
+            attributes.update(("env_file", env_file) for env_file in service.env_file)
+            attributes.update(("porfile", profile) for profile in service.profiles)
+            attributes.update(("device", device.host_path) for device in service.devices)
+
+        if detail == DetailLevels.services.value:
+            return len(services)
+        if detail == DetailLevels.services_networks.value:
+            return len(services) + len(networks)
+        return len(services) + len(networks) + len(attributes)
+
+    def select_detail(self) -> str:
+        if self.max_nodes is None:
+            return self.detail
+
+        # downgrade step by step until the graph fits into the node budget
+        levels = [level.value for level in DetailLevels]
+        level_index = levels.index(self.detail)
+        while level_index > 0 and self.count_vertices(levels[level_index]) > self.max_nodes:
+            level_index -= 1
+        return levels[level_index]
+
+    def hidden_attributes(self, service: Service) -> Optional[str]:
+        lines: List[str] = []
+        if self.detail == DetailLevels.services.value and service.networks:
+            lines.append(f"networks: {', '.join(service.networks)}")
+        if self.detail != DetailLevels.full.value:
+            if service.cgroup_parent is not None:
+                lines.append(f"cgroup_parent: {service.cgroup_parent}")
+            lines.extend(
+                f"volume: {volume.source} -> {volume.target} ({volume.access_mode})" for volume in service.volumes
+            )
+            lines.extend(f"expose: {expose}" for expose in service.expose)
+            lines.extend(f"port: {port.host_port} -> {port_label(port)}" for port in service.ports)
+            lines.extend(f"env_file: {env_file}" for env_file in service.env_file)
+            lines.extend(f"profile: {profile}" for profile in service.profiles)
+            lines.extend(f"device: {device.host_path} -> {device.container_path}" for device in service.devices)
+
+        return "\n".join(lines) if lines else None
+
+    def build(self) -> None:
+        if self.built:
+            return
+        self.built = True
+
+        self.detail = self.select_detail()
+        shows_networks = self.detail != DetailLevels.services.value
+        shows_attributes = self.detail == DetailLevels.full.value
+
+        for service in self.compose.services:
+            tooltip = self.hidden_attributes(service)
+            service_id = vertex_id("service", service.name)
+
+            if service.name in self.references:
+                self.add_vertex(
+                    service.name, "reference", lable=f"{service.name}\n(see {self.references[service.name]})"
+                )
+            elif service.image is not None:
                 self.add_vertex(
                     service.name,
                     "service",
                     lable=f"{service.container_name if service.container_name else service.name}\n({service.image})",
+                    tooltip=tooltip,
                 )
             if service.extends is not None:
-                self.add_vertex(service.name, "service", lable=f"{service.name}\n")
-                self.add_edge(service.extends.service_name, service.name, "extends")
-            if service.cgroup_parent is not None:
-                self.add_vertex(service.cgroup_parent, "cgroup")
-                self.add_edge(service.name, service.cgroup_parent, "links")
+                self.add_vertex(service.name, "service", lable=f"{service.name}\n", tooltip=tooltip)
+                self.add_edge(vertex_id("service", service.extends.service_name), service_id, "extends")
+            for link in service.links:
+                if ":" in link:
+                    service_name, alias = link.split(":", 1)
+                    self.add_edge(vertex_id("service", service_name), service_id, "links", alias)
+                else:
+                    self.add_edge(vertex_id("service", link), service_id, "links")
+            for depends_on in service.depends_on:
+                self.add_edge(service_id, vertex_id("service", depends_on), "depends_on")
+
+            if shows_networks:
+                for network in service.networks:
+                    network_id = self.add_vertex(network, "network", lable=f"net:{network}")
+                    self.add_edge(service_id, network_id, "links")
 
-            for network in service.networks:
-                self.add_vertex(network, "network", lable=f"net:{network}")
-                self.add_edge(service.name, network, "links")
+            if not shows_attributes:
+                continue
+
+            if service.cgroup_parent is not None:
+                cgroup_id = self.add_vertex(service.cgroup_parent, "cgroup")
+                self.add_edge(service_id, cgroup_id, "links")
             for volume in service.volumes:
-                self.add_vertex(volume.source, "volume")
+                volume_id = self.add_vertex(volume.source, "volume")
                 self.add_edge(
-                    service.name,
-                    volume.source,
+                    service_id,
+                    volume_id,
                     "volumes_rw" if "rw" in volume.access_mode else "volumes_ro",
                     lable=volume.target,
                 )
             for expose in service.expose:
-                self.add_vertex(expose, "port")
-                self.add_edge(expose, service.name, "exposes")
+                expose_id = self.add_vertex(expose, "port")
+                self.add_edge(expose_id, service_id, "exposes")
             for port in service.ports:
-                self.add_vertex(port.host_port, "port", lable=port.host_port)
-                self.add_edge(
-                    port.host_port,
-                    service.name,
-                    "links",
-                    lable=port.container_port
-                    + (("/" + port.protocol) if port.protocol != Protocol.any.value else "")
-                    + (("\n(" + port.app_protocol + ")") if port.app_protocol != AppProtocol.na.value else ""),
-                )
+                port_id = self.add_vertex(port.host_port, "port", lable=port.host_port)
+                self.add_edge(port_id, service_id, "links", lable=port_label(port))
             for env_file in service.env_file:
-                self.add_vertex(env_file, "env_file")
-                self.add_edge(env_file, service.name, "env_file")
-            for link in service.links:
-                if ":" in link:
-                    service_name, alias = link.split(":", 1)
-                    self.add_edge(service_name, service.name, "links", alias)
-                else:
-                    self.add_edge(link, service.name, "links")
-            for depends_on in service.depends_on:
-                self.add_edge(service.name, depends_on, "depends_on")
+                env_file_id = self.add_vertex(env_file, "env_file")
+                self.add_edge(env_file_id, service_id, "env_file")
             for porfile in service.profiles:
-                self.add_vertex(porfile, "porfile")
-                self.add_edge(service.name, porfile, "links")
+                porfile_id = self.add_vertex(porfile, "porfile")
+                self.add_edge(service_id, porfile_id, "links")
             for device in service.devices:
-                self.add_vertex(device.host_path, "device")
+                device_id = self.add_vertex(device.host_path, "device")
                 self.add_edge(
-                    device.host_path, service.name, "exposes", f"{device.container_path}\n({device.cgroup_permissions})"
+                    device_id, service_id, "exposes", f"{device.container_path}\n({device.cgroup_permissions})"
                 )
 
-        self.dot.render(outfile=f"{self.filename}.{format}", format=format, cleanup=cleanup)
+    def prepare(self, format: str, engine: str) -> Tuple[Optional[bytes], str]:
+        # exporters do not need a layout, their output is returned right away instead of the engine to lay it out with
+        self.build()
+
+        if format in EXPORTERS:
+            return EXPORTERS[format](list(self.vertices.values()), self.edges).encode(), engine
+
+        self.emit()
+        return None, self.select_engine(engine)
+
+    def write(self, format: str, output: bytes) -> None:
+        with open(f"{self.filename}.{EXTENSIONS.get(format, format)}", "wb") as output_file:
+            output_file.write(output)
+        if self.include_legend and format not in EXPORTERS:
+            legend.write_legend(self.filename, format)
+
+    def pipe(
+        self,
+        format: str,
+        engine: str = LayoutEngines.auto.value,
+        layout_timeout: Optional[float] = None,
+    ) -> bytes:
+        exported, engine = self.prepare(format, engine)
+        if exported is not None:
+            return exported
+
+        if layout_timeout is None:
+            return self.dot.pipe(format=format, engine=engine)
+        return layout.run_layout_with_fallback(self.dot.source, format, engine, layout_timeout)
+
+    def render(
+        self,
+        format: str,
+        cleanup: bool = True,
+        engine: str = LayoutEngines.auto.value,
+        layout_timeout: Optional[float] = None,
+    ) -> None:
+        # `cleanup` is kept for compatibility, the source is piped to graphviz without an intermediate file
+        self.write(format, self.pipe(format, engine=engine, layout_timeout=layout_timeout))
+
+    async def pipe_async(
+        self,
+        format: str,
+        engine: str = LayoutEngines.auto.value,
+        layout_timeout: Optional[float] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        executor: Optional[Executor] = None,
+    ) -> bytes:
+        # building and emitting the graph are CPU bound, they run in the executor to keep the event loop responsive
+        exported, engine = await asyncio.get_running_loop().run_in_executor(executor, self.prepare, format, engine)
+        if exported is not None:
+            return exported
+
+        if semaphore is None:
+            return await self.layout_async(format, engine, layout_timeout)
+        async with semaphore:
+            return await self.layout_async(format, engine, layout_timeout)
+
+    async def layout_async(self, format: str, engine: str, layout_timeout: Optional[float]) -> bytes:
+        if layout_timeout is None:
+            return await layout.run_layout_async(self.dot.source, format, engine)
+        return await layout.run_layout_with_fallback_async(self.dot.source, format, engine, layout_timeout)
+
+    async def render_async(
+        self,
+        format: str,
+        engine: str = LayoutEngines.auto.value,
+        layout_timeout: Optional[float] = None,
+        semaphore: Optional[asyncio.Semaphore] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        output = await self.pipe_async(
+            format, engine=engine, layout_timeout=layout_timeout, semaphore=semaphore, executor=executor
+        )
+        await asyncio.get_running_loop().run_in_executor(executor, self.write, format, output)
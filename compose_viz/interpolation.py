@@ -0,0 +1,159 @@
+import functools
+import os
+import re
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+
+# https://github.com/compose-spec/compose-spec/blob/master/spec.md#interpolation
+NAME = re.compile(r"[_a-zA-Z][_a-zA-Z0-9]*")
+OPERATORS = (":-", ":?", ":+", "-", "?", "+")
+
+# a template is a sequence of literals and `(name, operator, argument)` substitutions,
+# where the argument of an operator is a template itself, e.g. `${A:-${B}}`
+Part = Union[str, Tuple[str, Optional[str], tuple]]
+
+
+def _compile(template: str, position: int, nested: bool) -> Tuple[Tuple[Part, ...], int]:
+    parts: list = []
+    literal: list = []
+
+    while position < len(template):
+        char = template[position]
+        if nested and char == "}":
+            break
+        if char != "$":
+            literal.append(char)
+            position += 1
+            continue
+
+        following = template[position + 1] if position + 1 < len(template) else ""
+        if following == "$":
+            literal.append("$")
+            position += 2
+            continue
+
+        if following == "{":
+            match = NAME.match(template, position + 2)
+            if match is None:
+                raise RuntimeError(f"Invalid interpolation format in '{template}'")
+            name = match.group()
+            position = match.end()
+
+            operator: Optional[str] = None
+            argument: Tuple[Part, ...] = ()
+            for candidate in OPERATORS:
+                if template.startswith(candidate, position):
+                    operator = candidate
+                    argument, position = _compile(template, position + len(candidate), nested=True)
+                    break
+
+            if not template.startswith("}", position):
+                raise RuntimeError(f"Invalid interpolation format in '{template}'")
+            position += 1
+        else:
+            match = NAME.match(template, position + 1)
+            if match is None:
+                literal.append("$")
+                position += 1
+                continue
+            name, operator, argument = match.group(), None, ()
+            position = match.end()
+
+        if literal:
+            parts.append("".join(literal))
+            literal = []
+        parts.append((name, operator, argument))
+
+    if literal:
+        parts.append("".join(literal))
+    return tuple(parts), position
+
+
+@functools.lru_cache(maxsize=4096)
+def compile_template(template: str) -> Tuple[Part, ...]:
+    parts, _ = _compile(template, 0, nested=False)
+    return parts
+
+
+def evaluate(parts: Tuple[Part, ...], environment: Mapping[str, str]) -> str:
+    output = []
+    for part in parts:
+        if isinstance(part, str):
+            output.append(part)
+            continue
+
+        name, operator, argument = part
+        value = environment.get(name)
+        # without `:`, only unset variables are treated as missing, empty ones are kept
+        missing = value is None or (operator is not None and operator.startswith(":") and value == "")
+
+        if operator is None:
+            output.append(value or "")
+        elif operator.endswith("-"):
+            output.append(evaluate(argument, environment) if missing else str(value))
+        elif operator.endswith("?"):
+            if missing:
+                raise RuntimeError(f"Required variable '{name}' is missing a value: {evaluate(argument, environment)}")
+            output.append(str(value))
+        else:
+            output.append("" if missing else evaluate(argument, environment))
+
+    return "".join(output)
+
+
+def substitute(template: str, environment: Mapping[str, str]) -> str:
+    if "$" not in template:
+        return template
+    return evaluate(compile_template(template), environment)
+
+
+def interpolate(data: Any, environment: Mapping[str, str]) -> Any:
+    resolved: Dict[str, str] = {}
+
+    def resolve(data: Any) -> Any:
+        if isinstance(data, str):
+            if data not in resolved:
+                resolved[data] = substitute(data, environment)
+            return resolved[data]
+        if isinstance(data, dict):
+            return {key: resolve(value) for key, value in data.items()}
+        if isinstance(data, list):
+            return [resolve(value) for value in data]
+        return data
+
+    return resolve(data)
+
+
+def load_env_file(path: str) -> Dict[str, str]:
+    variables: Dict[str, str] = {}
+    if not os.path.isfile(path):
+        return variables
+
+    with open(path, "r") as env_file:
+        for line in env_file:
+            line = line.strip()
+            if not line or line.startswith("#") or "=" not in line:
+                continue
+
+            name, value = line.split("=", 1)
+            name = name.strip()
+            if name.startswith("export "):
+                name = name.split(" ", 1)[1].strip()
+            value = value.strip()
+
+            if len(value) >= 2 and value[0] == value[-1] and value[0] in "'\"":
+                quote, value = value[0], value[1:-1]
+                if quote == '"':
+                    value = value.replace("\\n", "\n")
+            elif " #" in value:
+                value = value.split(" #", 1)[0].rstrip()
+
+            variables[name] = value
+
+    return variables
+
+
+def load_environment(project_directory: str) -> Dict[str, str]:
+    # variables of the shell take precedence over the ones of the `.env` file
+    environment = load_env_file(os.path.join(project_directory, ".env"))
+    environment.update(os.environ)
+    return environment
@@ -0,0 +1,106 @@
+import asyncio
+import subprocess
+from typing import Dict, List, Optional, Tuple
+
+import graphviz
+
+# beyond this size `dot`'s crossing minimization dominates the run time
+DOT_MAX_NODES = 500
+DOT_MAX_EDGES = 1000
+
+# caps the iterations of `dot`'s mincross and network simplex passes
+REDUCED_DOT_SETTINGS = {
+    "mclimit": "0.1",
+    "nslimit": "1",
+    "nslimit1": "1",
+}
+
+
+def select_engine(node_count: int, edge_count: int) -> str:
+    if node_count <= DOT_MAX_NODES and edge_count <= DOT_MAX_EDGES:
+        return "dot"
+    return "sfdp"
+
+
+def layout_attempts(engine: str) -> List[Tuple[str, Dict[str, str]]]:
+    attempts: List[Tuple[str, Dict[str, str]]] = [(engine, {})]
+    if engine == "dot":
+        attempts.append(("dot", REDUCED_DOT_SETTINGS))
+    if engine != "sfdp":
+        attempts.append(("sfdp", {}))
+    return attempts
+
+
+def layout_command(format: str, engine: str, graph_attrs: Optional[Dict[str, str]] = None) -> List[str]:
+    return [engine, f"-T{format}"] + [f"-G{name}={value}" for name, value in (graph_attrs or {}).items()]
+
+
+def run_layout(
+    source: str,
+    format: str,
+    engine: str,
+    timeout: Optional[float] = None,
+    graph_attrs: Optional[Dict[str, str]] = None,
+) -> bytes:
+    cmd = layout_command(format, engine, graph_attrs)
+
+    try:
+        # `subprocess.run` kills the layout process once the timeout expires
+        process = subprocess.run(cmd, input=source.encode(), capture_output=True, timeout=timeout)
+    except FileNotFoundError as e:
+        raise graphviz.ExecutableNotFound(cmd) from e
+
+    if process.returncode != 0:
+        raise graphviz.CalledProcessError(process.returncode, cmd, output=process.stdout, stderr=process.stderr)
+
+    return process.stdout
+
+
+def run_layout_with_fallback(source: str, format: str, engine: str, timeout: float) -> bytes:
+    for attempt_engine, graph_attrs in layout_attempts(engine):
+        try:
+            return run_layout(source, format, attempt_engine, timeout, graph_attrs)
+        except subprocess.TimeoutExpired:
+            continue
+
+    raise RuntimeError(f"Layout did not finish within {timeout} seconds, even with faster settings, aborting.")
+
+
+async def run_layout_async(
+    source: str,
+    format: str,
+    engine: str,
+    timeout: Optional[float] = None,
+    graph_attrs: Optional[Dict[str, str]] = None,
+) -> bytes:
+    cmd = layout_command(format, engine, graph_attrs)
+
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cmd, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+    except FileNotFoundError as e:
+        raise graphviz.ExecutableNotFound(cmd) from e
+
+    try:
+        stdout, stderr = await asyncio.wait_for(process.communicate(source.encode()), timeout)
+    finally:
+        # timed out or cancelled, such as by a disconnected client, the layout process must not outlive the task
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+    if process.returncode != 0:
+        raise graphviz.CalledProcessError(process.returncode, cmd, output=stdout, stderr=stderr)
+
+    return stdout
+
+
+async def run_layout_with_fallback_async(source: str, format: str, engine: str, timeout: float) -> bytes:
+    for attempt_engine, graph_attrs in layout_attempts(engine):
+        try:
+            return await run_layout_async(source, format, attempt_engine, timeout, graph_attrs)
+        except asyncio.TimeoutError:
+            continue
+
+    raise RuntimeError(f"Layout did not finish within {timeout} seconds, even with faster settings, aborting.")
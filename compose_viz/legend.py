@@ -0,0 +1,67 @@
+import functools
+import hashlib
+
+import graphviz
+
+from compose_viz.cache import read_cache, write_cache
+from compose_viz.styles import EDGE_STYLES, VERTEX_STYLES
+
+LEGEND_EDGES = ["exposes", "links", "volumes_rw", "volumes_ro", "depends_on", "extends"]
+LEGEND_NODES = [
+    ("service", "service", "Service\n(image)"),
+    ("volume", "volume", "Volume"),
+    ("network", "network", "Network"),
+    ("port", "port", "Port"),
+    ("env_file", "env_file", "Env File"),
+    ("profile", "porfile", "Profile"),
+    ("cgroup", "cgroup", "CGroupe"),
+    ("device", "device", "Device"),
+]
+
+
+def build_legend() -> graphviz.Digraph:
+    dot = graphviz.Digraph()
+    dot.attr("graph", background="#ffffff", pad="0.5", rankdir="LR")
+
+    with dot.subgraph(name="cluster_edge_") as edge:
+        edge.attr(label="Edge")
+        for index, type in enumerate(LEGEND_EDGES):
+            edge.node(f"line_{index}_l", style="invis")
+            edge.node(f"line_{index}_r", style="invis")
+            edge.edge(f"line_{index}_l", f"line_{index}_r", label=type, **EDGE_STYLES[type])
+
+    with dot.subgraph(name="cluster_node_") as node:
+        node.attr(label="Node")
+        for name, type, label in LEGEND_NODES:
+            node.node(name, label=label, **VERTEX_STYLES[type])
+
+        node.body.append("{ rank=source;service network env_file cgroup }")
+
+    dot.node("inv", style="invis")
+    dot.edge("inv", "network", style="invis")
+    dot.edge("port", "line_2_l", style="invis")
+    return dot
+
+
+@functools.lru_cache(maxsize=None)
+def render_legend(format: str) -> bytes:
+    # the legend only depends on the styles, it is laid out once per format and style version and kept on disk
+    source = build_legend().source
+    name = f"legend-{hashlib.sha256(source.encode()).hexdigest()[:16]}.{format}"
+
+    output = read_cache(name)
+    if output is None:
+        output = graphviz.Source(source).pipe(format=format)
+        write_cache(name, output)
+    return output
+
+
+def legend_filename(filename: str, format: str) -> str:
+    return f"{filename}-legend.{format}"
+
+
+def write_legend(filename: str, format: str) -> str:
+    path = legend_filename(filename, format)
+    with open(path, "wb") as output_file:
+        output_file.write(render_legend(format))
+    return path
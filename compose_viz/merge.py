@@ -0,0 +1,88 @@
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# https://github.com/compose-spec/compose-spec/blob/master/13-merge.md
+# shell commands are replaced as a whole instead of being appended to
+REPLACED_SEQUENCES = {"command", "entrypoint", "test"}
+
+# fields which are either a list or a mapping, a list is converted when merged with a mapping
+MAPPING_SEQUENCES = {"annotations", "args", "depends_on", "environment", "labels", "networks", "sysctls"}
+
+
+def _identity(item: Any) -> Hashable:
+    return item if isinstance(item, Hashable) else repr(item)
+
+
+def _variable(item: Any) -> Hashable:
+    return str(item).split("=", 1)[0] if isinstance(item, str) else _identity(item)
+
+
+def _mount_target(item: Any) -> Hashable:
+    # `source:target[:mode]` or `target`, long syntax mounts define their target explicitly
+    if isinstance(item, dict):
+        return item.get("target", _identity(item))
+    parts = str(item).split(":")
+    return parts[1] if len(parts) > 1 else parts[0]
+
+
+def _file_target(item: Any) -> Hashable:
+    if isinstance(item, dict):
+        return item.get("target") or item.get("source", _identity(item))
+    return item
+
+
+# entries of these sequences are unique by a key, an override replaces the entry with the same key
+SEQUENCE_KEYS: Dict[str, Callable[[Any], Hashable]] = {
+    "annotations": _variable,
+    "args": _variable,
+    "configs": _file_target,
+    "devices": _mount_target,
+    "environment": _variable,
+    "labels": _variable,
+    "secrets": _file_target,
+    "volumes": _mount_target,
+}
+
+
+def to_mapping(field: str, items: List[Any]) -> Dict[str, Any]:
+    if field == "depends_on":
+        return {item: {"condition": "service_started"} for item in items}
+    if field == "networks":
+        return {item: None for item in items}
+
+    mapping: Dict[str, Optional[str]] = {}
+    for item in items:
+        name, separator, value = str(item).partition("=")
+        mapping[name] = value if separator else None
+    return mapping
+
+
+def merge_sequences(base: List[Any], override: List[Any], key: Callable[[Any], Hashable]) -> List[Any]:
+    merged = list(base)
+    positions = {key(item): index for index, item in enumerate(base)}
+    for item in override:
+        item_key = key(item)
+        if item_key in positions:
+            merged[positions[item_key]] = item
+        else:
+            positions[item_key] = len(merged)
+            merged.append(item)
+    return merged
+
+
+def merge(base: Any, override: Any, field: str = "") -> Any:
+    if isinstance(base, dict) and isinstance(override, dict):
+        # only the mappings along overridden paths are copied, untouched subtrees are shared with `base`
+        merged = dict(base)
+        for key, value in override.items():
+            merged[key] = merge(base[key], value, str(key)) if key in base else value
+        return merged
+
+    if isinstance(base, list) and isinstance(override, list) and field not in REPLACED_SEQUENCES:
+        return merge_sequences(base, override, SEQUENCE_KEYS.get(field, _identity))
+
+    if field in MAPPING_SEQUENCES and isinstance(base, (dict, list)) and isinstance(override, (dict, list)):
+        base = base if isinstance(base, dict) else to_mapping(field, base)
+        override = override if isinstance(override, dict) else to_mapping(field, override)
+        return merge(base, override, field)
+
+    return override
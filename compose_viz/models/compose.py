@@ -1,12 +1,27 @@
-from typing import List
+from typing import Dict, List
 
 from compose_viz.models.service import Service
 
 
 class Compose:
-    def __init__(self, services: List[Service]) -> None:
+    def __init__(
+        self,
+        services: List[Service],
+        external_networks: Dict[str, str] = {},
+        external_volumes: Dict[str, str] = {},
+    ) -> None:
         self._services = services
+        self._external_networks = external_networks
+        self._external_volumes = external_volumes
 
     @property
     def services(self):
         return self._services
+
+    @property
+    def external_networks(self):
+        return self._external_networks
+
+    @property
+    def external_volumes(self):
+        return self._external_volumes
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class Condition(str, Enum):
+    service_started = "service_started"
+    service_healthy = "service_healthy"
+    service_completed_successfully = "service_completed_successfully"
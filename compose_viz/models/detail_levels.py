@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class DetailLevels(str, Enum):
+    services = "services"
+    services_networks = "services+networks"
+    full = "full"
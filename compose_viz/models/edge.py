@@ -0,0 +1,25 @@
+from typing import Optional
+
+
+class Edge:
+    def __init__(self, head: str, tail: str, type: str, label: Optional[str] = None):
+        self._head = head
+        self._tail = tail
+        self._type = type
+        self._label = label
+
+    @property
+    def head(self):
+        return self._head
+
+    @property
+    def tail(self):
+        return self._tail
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def label(self):
+        return self._label
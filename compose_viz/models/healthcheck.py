@@ -0,0 +1,35 @@
+class Healthcheck:
+    # durations in seconds, defaulting to the values of the docker engine
+    def __init__(
+        self,
+        interval: float = 30.0,
+        timeout: float = 30.0,
+        retries: int = 3,
+        start_period: float = 0.0,
+        start_interval: float = 5.0,
+    ):
+        self._interval = interval
+        self._timeout = timeout
+        self._retries = retries
+        self._start_period = start_period
+        self._start_interval = start_interval
+
+    @property
+    def interval(self):
+        return self._interval
+
+    @property
+    def timeout(self):
+        return self._timeout
+
+    @property
+    def retries(self):
+        return self._retries
+
+    @property
+    def start_period(self):
+        return self._start_period
+
+    @property
+    def start_interval(self):
+        return self._start_interval
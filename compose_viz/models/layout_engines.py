@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class LayoutEngines(str, Enum):
+    auto = "auto"
+    dot = "dot"
+    neato = "neato"
+    sfdp = "sfdp"
+    fdp = "fdp"
@@ -0,0 +1,43 @@
+from typing import Dict, List, Optional, Tuple
+
+
+class Overlay:
+    # styles laid over a graph by the diff and analysis commands, vertices are keyed by their id
+    def __init__(
+        self,
+        changes: Optional[Dict[str, str]] = None,
+        ranks: Optional[List[List[str]]] = None,
+        highlights: Optional[Dict[str, str]] = None,
+        edge_highlights: Optional[Dict[Tuple[str, str], str]] = None,
+        heat: Optional[Dict[str, float]] = None,
+    ):
+        self._changes = changes if changes is not None else {}
+        self._ranks = ranks if ranks is not None else []
+        self._highlights = highlights if highlights is not None else {}
+        self._edge_highlights = edge_highlights if edge_highlights is not None else {}
+        self._heat = heat if heat is not None else {}
+
+    @property
+    def changes(self):
+        # services by name, colored by how they changed, see `compose_viz.diff`
+        return self._changes
+
+    @property
+    def ranks(self):
+        # rows of service names placed on the same rank, such as the start waves of `compose_viz.analysis`
+        return self._ranks
+
+    @property
+    def highlights(self):
+        # drawn with one of the `compose_viz.styles.HIGHLIGHT_STYLES`
+        return self._highlights
+
+    @property
+    def edge_highlights(self):
+        # by (head, tail) vertex ids
+        return self._edge_highlights
+
+    @property
+    def heat(self):
+        # filled by a value between 0 and 1, such as their share of the resources
+        return self._heat
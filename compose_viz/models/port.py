@@ -23,11 +23,14 @@ class Port:
         container_port: str,
         protocol: Protocol = Protocol.any,
         app_protocol: AppProtocol = AppProtocol.na,
+        published: bool = True,
     ):
         self._host_port = host_port
         self._container_port = container_port
         self._protocol = protocol
         self._app_protocol = app_protocol
+        # without an explicit host port the engine picks a free one, `host_port` repeats the container port then
+        self._published = published
 
     @property
     def host_port(self):
@@ -44,3 +47,7 @@ class Port:
     @property
     def app_protocol(self):
         return self._app_protocol
+
+    @property
+    def published(self):
+        return self._published
@@ -0,0 +1,6 @@
+from enum import Enum
+
+
+class ResourceMetrics(str, Enum):
+    cpus = "cpus"
+    memory = "memory"
@@ -0,0 +1,44 @@
+from typing import Optional
+
+
+class Resources:
+    # cpus in cores and memory in bytes, for a single replica
+    def __init__(
+        self,
+        cpus_limit: Optional[float] = None,
+        memory_limit: Optional[int] = None,
+        pids_limit: Optional[int] = None,
+        cpus_reservation: Optional[float] = None,
+        memory_reservation: Optional[int] = None,
+        replicas: int = 1,
+    ):
+        self._cpus_limit = cpus_limit
+        self._memory_limit = memory_limit
+        self._pids_limit = pids_limit
+        self._cpus_reservation = cpus_reservation
+        self._memory_reservation = memory_reservation
+        self._replicas = replicas
+
+    @property
+    def cpus_limit(self):
+        return self._cpus_limit
+
+    @property
+    def memory_limit(self):
+        return self._memory_limit
+
+    @property
+    def pids_limit(self):
+        return self._pids_limit
+
+    @property
+    def cpus_reservation(self):
+        return self._cpus_reservation
+
+    @property
+    def memory_reservation(self):
+        return self._memory_reservation
+
+    @property
+    def replicas(self):
+        return self._replicas
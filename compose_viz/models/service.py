@@ -1,8 +1,11 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+from compose_viz.models.condition import Condition
 from compose_viz.models.device import Device
 from compose_viz.models.extends import Extends
+from compose_viz.models.healthcheck import Healthcheck
 from compose_viz.models.port import Port
+from compose_viz.models.resources import Resources
 from compose_viz.models.volume import Volume
 
 
@@ -23,6 +26,9 @@ class Service:
         env_file: List[str] = [],
         expose: List[str] = [],
         profiles: List[str] = [],
+        depends_on_conditions: Dict[str, Condition] = {},
+        healthcheck: Optional[Healthcheck] = None,
+        resources: Optional[Resources] = None,
     ) -> None:
         self._name = name
         self._image = image
@@ -38,6 +44,9 @@ class Service:
         self._env_file = env_file
         self._expose = expose
         self._profiles = profiles
+        self._depends_on_conditions = depends_on_conditions
+        self._healthcheck = healthcheck
+        self._resources = resources
 
     @property
     def name(self):
@@ -94,3 +103,15 @@ class Service:
     @property
     def profiles(self):
         return self._profiles
+
+    @property
+    def depends_on_conditions(self):
+        return self._depends_on_conditions
+
+    @property
+    def healthcheck(self):
+        return self._healthcheck
+
+    @property
+    def resources(self):
+        return self._resources
@@ -0,0 +1,35 @@
+from typing import Optional
+
+
+def vertex_id(type: str, name: str) -> str:
+    # services and the references standing in for them share one namespace, other kinds of vertices have their own
+    namespace = "service" if type == "reference" else type
+    return f"{namespace}:{name}"
+
+
+class Vertex:
+    def __init__(self, name: str, type: str, label: Optional[str] = None, tooltip: Optional[str] = None):
+        self._name = name
+        self._type = type
+        self._label = label
+        self._tooltip = tooltip
+
+    @property
+    def id(self):
+        return vertex_id(self._type, self._name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def type(self):
+        return self._type
+
+    @property
+    def label(self):
+        return self._label
+
+    @property
+    def tooltip(self):
+        return self._tooltip
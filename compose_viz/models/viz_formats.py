@@ -8,6 +8,13 @@ class VizFormats(str, Enum):
     json = "json"
     svg = "svg"
 
+    csv = "csv"
+    d2 = "d2"
+    graphml = "graphml"
+    json_adjacency = "json-adjacency"
+    mermaid = "mermaid"
+    plantuml = "plantuml"
+
     bmp = "bmp"
     canon = "canon"
     cmap = "cmap"
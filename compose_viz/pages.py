@@ -0,0 +1,163 @@
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import graphviz
+
+from compose_viz import legend
+from compose_viz.exporters import EXPORTERS, EXTENSIONS
+from compose_viz.graph import Graph
+from compose_viz.models.compose import Compose
+from compose_viz.models.detail_levels import DetailLevels
+from compose_viz.models.layout_engines import LayoutEngines
+from compose_viz.models.service import Service
+from compose_viz.styles import VERTEX_STYLES
+
+# services without any network are attached to compose's implicit default network
+DEFAULT_PAGE = "default"
+
+
+def home_page(service: Service) -> str:
+    return service.networks[0] if service.networks else DEFAULT_PAGE
+
+
+def partition_by_network(compose: Compose) -> Dict[str, Tuple[Compose, Dict[str, str]]]:
+    homes = {service.name: home_page(service) for service in compose.services}
+    members: Dict[str, List[Service]] = {}
+    for service in compose.services:
+        for page in service.networks or [DEFAULT_PAGE]:
+            members.setdefault(page, []).append(service)
+
+    pages: Dict[str, Tuple[Compose, Dict[str, str]]] = {}
+    for page, page_members in members.items():
+        services: List[Service] = []
+        references: Dict[str, str] = {}
+        for service in page_members:
+            if homes[service.name] == page:
+                services.append(service)
+            else:
+                services.append(Service(name=service.name, networks=[page]))
+                references[service.name] = homes[service.name]
+
+        # dependencies living on other pages become stubs, so that no edge dangles
+        on_page = {service.name for service in services}
+        for service in page_members:
+            if service.name in references:
+                continue
+
+            targets = service.depends_on + [link.split(":", 1)[0] for link in service.links]
+            if service.extends is not None:
+                targets.append(service.extends.service_name)
+
+            for target in targets:
+                if target in homes and target not in on_page:
+                    services.append(Service(name=target))
+                    references[target] = homes[target]
+                    on_page.add(target)
+
+        pages[page] = (Compose(services=services), references)
+
+    return pages
+
+
+def page_filename(filename: str, page: str) -> str:
+    # pages are namespaced, so that no network name collides with the legend or another output next to the index
+    return f"{filename}-page-{page.replace(os.sep, '_')}"
+
+
+def _render_page(
+    compose: Compose,
+    references: Dict[str, str],
+    filename: str,
+    format: str,
+    detail: str,
+    max_nodes: Optional[int],
+    engine: str,
+    layout_timeout: Optional[float],
+    coalesce_edges: bool,
+) -> str:
+    graph = Graph(
+        compose,
+        filename,
+        False,
+        references=references,
+        detail=detail,
+        max_nodes=max_nodes,
+        coalesce_edges=coalesce_edges,
+    )
+    graph.render(format, engine=engine, layout_timeout=layout_timeout)
+    return f"{filename}.{EXTENSIONS.get(format, format)}"
+
+
+def render_index(
+    pages: Dict[str, Tuple[Compose, Dict[str, str]]],
+    filename: str,
+    format: str,
+) -> str:
+    dot = graphviz.Digraph()
+    dot.attr("graph", background="#ffffff", pad="0.5")
+
+    # networks are referred to by generated ids, their names only appear in labels
+    node_ids = {page: f"n{index}" for index, page in enumerate(pages)}
+    for page, (compose, references) in pages.items():
+        dot.node(
+            node_ids[page],
+            f"{page}\n({len(compose.services) - len(references)} services)",
+            URL=f"{os.path.basename(page_filename(filename, page))}.{format}",
+            **VERTEX_STYLES["network"],
+        )
+
+    # pages sharing services are linked, weighted by the number of shared services
+    shared: Counter = Counter()
+    for page, (_, references) in pages.items():
+        for home in references.values():
+            if home != page:
+                shared[tuple(sorted((page, home)))] += 1
+    for (page_a, page_b), count in shared.items():
+        dot.edge(node_ids[page_a], node_ids[page_b], f"{count}", dir="none", style="dashed")
+
+    with open(f"{filename}.{format}", "wb") as output_file:
+        output_file.write(dot.pipe(format=format))
+    return f"{filename}.{format}"
+
+
+def render_pages(
+    compose: Compose,
+    filename: str,
+    format: str,
+    include_legend: bool = False,
+    detail: str = DetailLevels.full.value,
+    max_nodes: Optional[int] = None,
+    engine: str = LayoutEngines.auto.value,
+    layout_timeout: Optional[float] = None,
+    max_workers: Optional[int] = None,
+    coalesce_edges: bool = True,
+) -> List[str]:
+    pages = partition_by_network(compose)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(
+                _render_page,
+                page_compose,
+                references,
+                page_filename(filename, page),
+                format,
+                detail,
+                max_nodes,
+                engine,
+                layout_timeout,
+                coalesce_edges,
+            )
+            for page, (page_compose, references) in pages.items()
+        ]
+        # exported formats have no notion of links, so they come without an index page
+        outputs = [render_index(pages, filename, format)] if format not in EXPORTERS else []
+        outputs.extend(future.result() for future in futures)
+
+    # all pages share a single legend
+    if include_legend and format not in EXPORTERS:
+        outputs.append(legend.write_legend(filename, format))
+
+    return outputs
@@ -1,19 +1,83 @@
+import functools
+import os
 import re
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Union
 
 from pydantic_yaml import parse_yaml_raw_as
 
 import compose_viz.spec.compose_spec as spec
+from compose_viz import schema
+from compose_viz.interpolation import interpolate, load_environment
+from compose_viz.merge import merge
 from compose_viz.models.compose import Compose, Service
+from compose_viz.models.condition import Condition
 from compose_viz.models.device import Device
 from compose_viz.models.extends import Extends
+from compose_viz.models.healthcheck import Healthcheck
 from compose_viz.models.port import AppProtocol, Port, Protocol
+from compose_viz.models.resources import Resources
 from compose_viz.models.volume import Volume, VolumeType
 
+DURATION_UNITS = {"ns": 1e-9, "us": 1e-6, "ms": 1e-3, "s": 1.0, "m": 60.0, "h": 3600.0}
+DURATION = re.compile(r"(\d+(?:\.\d+)?)(ns|us|ms|s|m|h)")
+
+
+def parse_duration(value: Optional[str], default: float = 0.0) -> float:
+    # go durations as used by compose, e.g. `1m30s` or `500ms`
+    if not value:
+        return default
+    assert DURATION.sub("", value) == "", f"Invalid duration '{value}', aborting."
+    return sum(float(amount) * DURATION_UNITS[unit] for amount, unit in DURATION.findall(value))
+
+
+BYTE_UNITS = {"": 1, "b": 1, "k": 1024, "m": 1024**2, "g": 1024**3, "t": 1024**4}
+BYTES = re.compile(r"(\d+(?:\.\d+)?)\s*([kmgt]?)b?", re.IGNORECASE)
+
+
+def parse_bytes(value: Union[str, float, None]) -> Optional[int]:
+    # byte values as used by compose, e.g. `512m`, `1.5gb` or a plain number of bytes
+    if value is None:
+        return None
+    match = BYTES.fullmatch(str(value).strip())
+    assert match is not None, f"Invalid byte value '{value}', aborting."
+    return int(float(match.group(1)) * BYTE_UNITS[match.group(2).lower()])
+
+
+def parse_cpus(value: Union[str, float, None]) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def load_yaml(content: str) -> Any:
+    # loaded into plain data, the model is validated after interpolation and merging
+    return parse_yaml_raw_as(Any, content)  # type: ignore
+
+
+@functools.lru_cache(maxsize=256)
+def _load_file(file_path: str, modified: int, size: int) -> Any:
+    with open(file_path, "r") as file:
+        return load_yaml(file.read())
+
+
+def load_file(file_path: str) -> Any:
+    # files are parsed once per modification, the loaded documents are shared and must not be mutated
+    stat = os.stat(file_path)
+    return _load_file(os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size)
+
 
 class Parser:
-    def __init__(self):
-        pass
+    def __init__(self, environment: Optional[Mapping[str, str]] = None, schema_path: Optional[str] = None):
+        # defaults to the shell environment and the `.env` file next to the compose file
+        self._environment = environment
+        # documents are validated against this json schema first, for the exact errors of the compose-spec,
+        # only for the quality of the errors: valid documents are still converted through the pydantic models
+        self._schema_path = schema_path
+
+    def environment(self, file_path: str) -> Mapping[str, str]:
+        if self._environment is not None:
+            return self._environment
+        if os.path.isfile(file_path):
+            return load_environment(os.path.dirname(os.path.abspath(file_path)))
+        return load_environment(os.getcwd())
 
     @staticmethod
     def _unwrap_depends_on(data_depends_on: Union[spec.ListOfStrings, Dict[Any, spec.DependsOn], None]) -> List[str]:
@@ -25,6 +89,15 @@ class Parser:
                 service_depends_on.append(str(depends_on))
         return service_depends_on
 
+    @staticmethod
+    def _unwrap_depends_on_conditions(
+        data_depends_on: Union[spec.ListOfStrings, Dict[Any, spec.DependsOn], None]
+    ) -> Dict[str, Condition]:
+        # the short syntax waits for the dependency to be started only
+        if type(data_depends_on) is dict:
+            return {str(depends_on): Condition(data.condition.value) for depends_on, data in data_depends_on.items()}
+        return {depends_on: Condition.service_started for depends_on in Parser._unwrap_depends_on(data_depends_on)}
+
     @staticmethod
     def compile_dependencies(service_name: str, services: Dict[Any, spec.Service], file_path: str) -> List[str]:
         assert service_name in services, f"Service '{service_name}' not found in given compose file: '{file_path}'"
@@ -36,13 +109,78 @@ class Parser:
                 dependencies.extend(Parser.compile_dependencies(dependency, services, file_path))
         return dependencies
 
-    def parse(self, file_path: str, root_service: Optional[str] = None) -> Compose:
+    @staticmethod
+    def _normalize_external(raw_data: Any) -> Any:
+        # `external: true` is valid compose, but the generated models only accept its mapping form
+        if not isinstance(raw_data, dict):
+            return raw_data
+
+        normalized = dict(raw_data)
+        for kind in ("networks", "volumes", "secrets", "configs"):
+            resources = raw_data.get(kind)
+            if not isinstance(resources, dict):
+                continue
+
+            normalized[kind] = {}
+            for key, resource in resources.items():
+                if isinstance(resource, dict) and isinstance(resource.get("external"), bool):
+                    external = resource["external"]
+                    resource = {name: value for name, value in resource.items() if name != "external"}
+                    if external:
+                        resource["external"] = {}
+                normalized[kind][key] = resource
+        return normalized
+
+    @staticmethod
+    def _external_names(resources: Optional[Dict[Any, Any]]) -> Dict[str, str]:
+        # external or explicitly named resources are shared beyond the project, under their engine name
+        names: Dict[str, str] = {}
+        for key, resource in (resources or {}).items():
+            if resource is None:
+                continue
+            if resource.external is not None:
+                names[str(key)] = resource.external.name or resource.name or str(key)
+            elif resource.name is not None:
+                names[str(key)] = resource.name
+        return names
+
+    def parse(self, file_paths: Union[str, Sequence[str]], root_service: Optional[str] = None) -> Compose:
+        # later files override earlier ones, following `docker compose -f base.yml -f override.yml`
+        if isinstance(file_paths, str):
+            file_paths = [file_paths]
+        file_path = ", ".join(file_paths)
+
+        try:
+            raw_data = None
+            for path in file_paths:
+                # variables are resolved relative to the first file, like compose's project directory
+                document = interpolate(load_file(path), self.environment(file_paths[0]))
+                raw_data = document if raw_data is None else merge(raw_data, document)
+        except Exception as e:
+            raise RuntimeError(f"Error parsing file '{file_path}': {e}")
+
+        return self.convert(raw_data, root_service=root_service, file_path=file_path)
+
+    def parse_string(self, content: str, root_service: Optional[str] = None, file_path: str = "<string>") -> Compose:
+        try:
+            raw_data = interpolate(load_yaml(content), self.environment(file_path))
+        except Exception as e:
+            raise RuntimeError(f"Error parsing file '{file_path}': {e}")
+
+        return self.convert(raw_data, root_service=root_service, file_path=file_path)
+
+    def convert(self, raw_data: Any, root_service: Optional[str] = None, file_path: str = "<string>") -> Compose:
         compose_data: spec.ComposeSpecification
 
+        if self._schema_path is not None:
+            validate = schema.load_validator(self._schema_path)
+            try:
+                validate(raw_data)
+            except Exception as e:
+                raise RuntimeError(f"Error parsing file '{file_path}': {e}")
+
         try:
-            with open(file_path, "r") as file:
-                file_content = file.read()
-            compose_data = parse_yaml_raw_as(spec.ComposeSpecification, file_content)
+            compose_data = spec.ComposeSpecification.model_validate(Parser._normalize_external(raw_data))
         except Exception as e:
             raise RuntimeError(f"Error parsing file '{file_path}': {e}")
 
@@ -102,10 +240,12 @@ class Parser:
                     container_port: Optional[str] = None
                     protocol: Optional[str] = None
                     app_protocol: Optional[str] = None
+                    published = True
 
                     if type(port_data) is float:
                         container_port = str(int(port_data))
                         host_port = f"0.0.0.0:{container_port}"
+                        published = False
                     elif type(port_data) is str:
                         regex = r"((?P<host_ip>\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}:|(\$\{([^}]+)\}):)|:|)?((?P<host_port>\d+(\-\d+)?):)?((?P<container_port>\d+(\-\d+)?))?(/(?P<protocol>\w+))?"  # noqa: E501
                         match = re.match(regex, port_data)
@@ -120,6 +260,7 @@ class Parser:
 
                             if container_port is not None and host_port is None:
                                 host_port = container_port
+                                published = False
 
                             if host_ip is not None:
                                 host_port = f"{host_ip}{host_port}"
@@ -140,6 +281,7 @@ class Parser:
 
                         if container_port is not None and host_port is None:
                             host_port = container_port
+                            published = False
 
                         if host_ip is not None:
                             host_port = f"{host_ip}:{host_port}"
@@ -161,12 +303,15 @@ class Parser:
                             container_port=container_port,
                             protocol=Protocol[protocol],
                             app_protocol=AppProtocol[app_protocol],
+                            published=published,
                         )
                     )
 
             service_depends_on: List[str] = []
+            service_depends_on_conditions: Dict[str, Condition] = {}
             if service_data.depends_on is not None:
                 service_depends_on = Parser._unwrap_depends_on(service_data.depends_on)
+                service_depends_on_conditions = Parser._unwrap_depends_on_conditions(service_data.depends_on)
 
             service_volumes: List[Volume] = []
             if service_data.volumes is not None:
@@ -175,13 +320,18 @@ class Parser:
                         assert ":" in volume_data, "Invalid volume input, aborting."
 
                         spilt_data = volume_data.split(":")
+                        # the short syntax does not tell bind mounts apart from named volumes, only their source does
+                        volume_type = (
+                            VolumeType.bind if spilt_data[0].startswith((".", "/", "~")) else VolumeType.volume
+                        )
                         if len(spilt_data) == 2:
-                            service_volumes.append(Volume(source=spilt_data[0], target=spilt_data[1]))
+                            service_volumes.append(Volume(source=spilt_data[0], target=spilt_data[1], type=volume_type))
                         elif len(spilt_data) == 3:
                             service_volumes.append(
                                 Volume(
                                     source=spilt_data[0],
                                     target=spilt_data[1],
+                                    type=volume_type,
                                     access_mode=spilt_data[2],
                                 )
                             )
@@ -200,9 +350,59 @@ class Parser:
                                 source=volume_data.source,
                                 target=volume_data.target,
                                 type=VolumeType[volume_data.type],
+                                access_mode="ro" if volume_data.read_only else "rw",
                             )
                         )
 
+            # the service level `tmpfs` key mounts tmpfs at each target, optionally followed by its mount options
+            if service_data.tmpfs is not None:
+                tmpfs_data = service_data.tmpfs.root
+                for tmpfs in [tmpfs_data] if type(tmpfs_data) is str else tmpfs_data.root:
+                    target, _, options = tmpfs.partition(":")
+                    service_volumes.append(
+                        Volume(
+                            source=target,
+                            target=target,
+                            type=VolumeType.tmpfs,
+                            access_mode="ro" if "ro" in options.split(",") else "rw",
+                        )
+                    )
+
+            healthcheck: Optional[Healthcheck] = None
+            healthcheck_data = service_data.healthcheck
+            # `disable: true` and `test: ["NONE"]` turn off the healthcheck of the image
+            if healthcheck_data is not None and not healthcheck_data.disable and healthcheck_data.test != ["NONE"]:
+                defaults = Healthcheck()
+                healthcheck = Healthcheck(
+                    interval=parse_duration(healthcheck_data.interval, defaults.interval),
+                    timeout=parse_duration(healthcheck_data.timeout, defaults.timeout),
+                    retries=int(healthcheck_data.retries) if healthcheck_data.retries is not None else defaults.retries,
+                    start_period=parse_duration(healthcheck_data.start_period, defaults.start_period),
+                    start_interval=parse_duration(healthcheck_data.start_interval, defaults.start_interval),
+                )
+
+            # deploy.resources take precedence over the older service level options
+            limits = spec.Limits()
+            reservations = spec.Reservations()
+            replicas = 1
+            if service_data.deploy is not None:
+                if service_data.deploy.resources is not None:
+                    limits = service_data.deploy.resources.limits or limits
+                    reservations = service_data.deploy.resources.reservations or reservations
+                if service_data.deploy.replicas is not None:
+                    replicas = service_data.deploy.replicas
+            pids_limit = limits.pids if limits.pids is not None else service_data.pids_limit
+            resources = Resources(
+                cpus_limit=parse_cpus(limits.cpus if limits.cpus is not None else service_data.cpus),
+                memory_limit=parse_bytes(limits.memory if limits.memory is not None else service_data.mem_limit),
+                pids_limit=int(float(pids_limit)) if pids_limit is not None else None,
+                cpus_reservation=parse_cpus(reservations.cpus),
+                memory_reservation=parse_bytes(
+                    reservations.memory if reservations.memory is not None else service_data.mem_reservation
+                ),
+                replicas=replicas,
+            )
+
             service_links: List[str] = []
             if service_data.links is not None:
                 service_links = service_data.links
@@ -272,7 +472,14 @@ class Parser:
                     expose=expose,
                     profiles=profiles,
                     devices=devices,
+                    depends_on_conditions=service_depends_on_conditions,
+                    healthcheck=healthcheck,
+                    resources=resources,
                 )
             )
 
-        return Compose(services=services)
+        return Compose(
+            services=services,
+            external_networks=Parser._external_names(compose_data.networks),
+            external_volumes=Parser._external_names(compose_data.volumes),
+        )
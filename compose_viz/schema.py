@@ -0,0 +1,44 @@
+import functools
+import hashlib
+import json
+import os
+from typing import Any, Callable
+
+from compose_viz.cache import read_cache, write_cache
+
+try:
+    import fastjsonschema
+except ImportError:  # pragma: no cover
+    fastjsonschema = None
+
+
+@functools.lru_cache(maxsize=16)
+def _load_validator(path: str, mtime_ns: int, size: int) -> Callable[[Any], Any]:
+    # compiled to python once per schema and fastjsonschema version, later runs only import the generated code
+    with open(path, "rb") as schema_file:
+        content = schema_file.read()
+    name = f"schema-{hashlib.sha256(content + fastjsonschema.VERSION.encode()).hexdigest()[:16]}.py"
+
+    code = read_cache(name)
+    if code is None:
+        code = fastjsonschema.compile_to_code(json.loads(content)).encode()
+        write_cache(name, code)
+
+    namespace: dict = {}
+    exec(compile(code, name, "exec"), namespace)
+    return namespace["validate"]
+
+
+def load_validator(path: str) -> Callable[[Any], Any]:
+    if fastjsonschema is None:
+        raise RuntimeError(
+            "Schema validation requires the optional fastjsonschema package: pip install compose-viz[schema]"
+        )
+    if not os.path.isfile(path):
+        raise RuntimeError(
+            f"Compose schema not found at '{path}', "
+            "pass the path of compose-spec.json, e.g. schema/compose-spec.json of the compose-spec repository."
+        )
+
+    stat = os.stat(path)
+    return _load_validator(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
@@ -0,0 +1,177 @@
+import functools
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Mapping, Optional
+from urllib.parse import parse_qs, urlparse
+
+from compose_viz.exporters import EXPORTERS
+from compose_viz.graph import Graph
+from compose_viz.layout import run_layout, run_layout_with_fallback
+from compose_viz.models.compose import Compose
+from compose_viz.models.detail_levels import DetailLevels
+from compose_viz.models.layout_engines import LayoutEngines
+from compose_viz.models.viz_formats import VizFormats
+from compose_viz.parser import Parser
+
+# compose files are small, larger requests are rejected before they are read into memory
+MAX_BODY_SIZE = 10 * 1024 * 1024
+
+TEXT_CONTENT_TYPE = "text/plain; charset=utf-8"
+
+# graphviz output formats, anything not listed is served as binary
+CONTENT_TYPES = {
+    "svg": "image/svg+xml",
+    "png": "image/png",
+    "jpeg": "image/jpeg",
+    "jpe": "image/jpeg",
+    "jpg": "image/jpeg",
+    "gif": "image/gif",
+    "bmp": "image/bmp",
+    "tif": "image/tiff",
+    "tiff": "image/tiff",
+    "pdf": "application/pdf",
+    "eps": "application/postscript",
+    "ps": "application/postscript",
+    "ps2": "application/postscript",
+    "json": "application/json",
+    "json0": "application/json",
+    "dot_json": "application/json",
+    "xdot_json": "application/json",
+    "cmapx": "text/html; charset=utf-8",
+    "cmapx_np": "text/html; charset=utf-8",
+    "vml": "application/xml",
+    "dot": TEXT_CONTENT_TYPE,
+    "gv": TEXT_CONTENT_TYPE,
+    "canon": TEXT_CONTENT_TYPE,
+    "xdot": TEXT_CONTENT_TYPE,
+    "xdot1.2": TEXT_CONTENT_TYPE,
+    "xdot1.4": TEXT_CONTENT_TYPE,
+    "plain": TEXT_CONTENT_TYPE,
+    "plain-ext": TEXT_CONTENT_TYPE,
+    "cmap": TEXT_CONTENT_TYPE,
+    "imap": TEXT_CONTENT_TYPE,
+    "imap_np": TEXT_CONTENT_TYPE,
+    "ismap": TEXT_CONTENT_TYPE,
+    "fig": TEXT_CONTENT_TYPE,
+    "mp": TEXT_CONTENT_TYPE,
+    "pic": TEXT_CONTENT_TYPE,
+    "pov": TEXT_CONTENT_TYPE,
+    "tk": TEXT_CONTENT_TYPE,
+}
+
+
+class RenderService:
+    def __init__(
+        self,
+        workers: int,
+        cache_size: int = 128,
+        layout_timeout: Optional[float] = None,
+        environment: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        # bounds the number of concurrently running graphviz processes
+        self.layout_slots = threading.BoundedSemaphore(workers)
+        self.layout_timeout = layout_timeout
+        # documents come from clients, they never see the environment of the server unless it is passed explicitly
+        self.environment = environment if environment is not None else {}
+        self.parse = functools.lru_cache(maxsize=cache_size)(self._parse)
+        self.layout = functools.lru_cache(maxsize=cache_size)(self._layout)
+
+    def _parse(self, content: str, root_service: Optional[str]) -> Compose:
+        return Parser(environment=self.environment).parse_string(content, root_service=root_service)
+
+    def _layout(self, source: str, format: str, engine: str) -> bytes:
+        with self.layout_slots:
+            if self.layout_timeout is None:
+                return run_layout(source, format, engine)
+            return run_layout_with_fallback(source, format, engine, self.layout_timeout)
+
+    def render(
+        self,
+        compose: Compose,
+        format: str,
+        detail: str = DetailLevels.full.value,
+        max_nodes: Optional[int] = None,
+        engine: str = LayoutEngines.auto.value,
+    ) -> bytes:
+        graph = Graph(compose, "", False, detail=detail, max_nodes=max_nodes)
+        graph.build()
+
+        if format in EXPORTERS:
+            return EXPORTERS[format](list(graph.vertices.values()), graph.edges).encode()
+
+        graph.emit()
+        return self.layout(graph.dot.source, format, graph.select_engine(engine))
+
+
+def content_type(format: str) -> str:
+    # exported formats are text, whatever the mime.types of the host map their extensions to
+    if format in EXPORTERS:
+        return TEXT_CONTENT_TYPE
+    return CONTENT_TYPES.get(format, "application/octet-stream")
+
+
+class RenderRequestHandler(BaseHTTPRequestHandler):
+    server: "RenderServer"
+
+    def reply(self, status: int, body: bytes, content_type: str = TEXT_CONTENT_TYPE) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if urlparse(self.path).path == "/health":
+            self.reply(200, b"ok\n")
+        else:
+            self.reply(404, b"Not found\n")
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/render":
+            self.reply(404, b"Not found\n")
+            return
+
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        try:
+            format = VizFormats(query.get("format", VizFormats.svg.value)).value
+            detail = DetailLevels(query.get("detail", DetailLevels.full.value)).value
+            engine = LayoutEngines(query.get("engine", LayoutEngines.auto.value)).value
+            max_nodes = int(query["max_nodes"]) if "max_nodes" in query else None
+        except ValueError as e:
+            self.reply(400, f"{e}\n".encode())
+            return
+
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+        except ValueError:
+            self.reply(400, b"Invalid Content-Length\n")
+            return
+        if length < 0 or length > self.server.max_body_size:
+            self.reply(413, f"Request body exceeds {self.server.max_body_size} bytes\n".encode())
+            return
+
+        try:
+            content = self.rfile.read(length).decode()
+            compose = self.server.service.parse(content, query.get("root_service"))
+        except Exception as e:
+            # any failure of the parser is a problem of the posted document, it must not drop the connection
+            self.reply(400, f"{e}\n".encode())
+            return
+
+        try:
+            output = self.server.service.render(compose, format, detail=detail, max_nodes=max_nodes, engine=engine)
+        except Exception as e:
+            self.reply(500, f"{e}\n".encode())
+            return
+
+        self.reply(200, output, content_type(format))
+
+
+class RenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str, port: int, service: RenderService, max_body_size: int = MAX_BODY_SIZE) -> None:
+        super().__init__((host, port), RenderRequestHandler)
+        self.service = service
+        self.max_body_size = max_body_size
@@ -0,0 +1,122 @@
+from typing import Dict, List
+
+# styles are built once and shared, their attributes are listed in the order they are emitted in
+VERTEX_STYLES: Dict[str, Dict[str, str]] = {
+    "service": {
+        "shape": "component",
+    },
+    "volume": {
+        "shape": "cylinder",
+    },
+    "network": {
+        "shape": "pentagon",
+    },
+    "port": {
+        "shape": "circle",
+    },
+    "env_file": {
+        "shape": "tab",
+    },
+    "porfile": {
+        "shape": "invhouse",
+    },
+    "cgroup": {
+        "shape": "diamond",
+    },
+    "device": {
+        "shape": "box3d",
+    },
+    "reference": {
+        "shape": "component",
+        "style": "dashed",
+    },
+}
+
+EDGE_STYLES: Dict[str, Dict[str, str]] = {
+    "exposes": {
+        "dir": "both",
+        "style": "solid",
+    },
+    "links": {
+        "style": "solid",
+    },
+    "volumes_rw": {
+        "dir": "both",
+        "style": "dashed",
+    },
+    "volumes_ro": {
+        "style": "dashed",
+    },
+    "depends_on": {
+        "style": "dotted",
+    },
+    "extends": {
+        "arrowhead": "inv",
+        "arrowtail": "dot",
+        "dir": "both",
+    },
+    "env_file": {
+        "style": "solid",
+    },
+}
+
+CHANGE_STYLES: Dict[str, Dict[str, str]] = {
+    "added": {
+        "color": "#2da44e",
+        "fontcolor": "#2da44e",
+        "penwidth": "2",
+    },
+    "removed": {
+        "color": "#cf222e",
+        "fontcolor": "#cf222e",
+        "penwidth": "2",
+        "style": "dashed",
+    },
+    "changed": {
+        "color": "#bf8700",
+        "fontcolor": "#bf8700",
+        "penwidth": "2",
+    },
+    "unchanged": {
+        "color": "#8c959f",
+        "fontcolor": "#8c959f",
+    },
+}
+
+HIGHLIGHT_STYLES: Dict[str, Dict[str, str]] = {
+    "critical": {
+        "color": "#8250df",
+        "fontcolor": "#8250df",
+        "penwidth": "3",
+    },
+    "conflict": {
+        "color": "#cf222e",
+        "fontcolor": "#cf222e",
+        "penwidth": "3",
+    },
+    "contention": {
+        "color": "#bf8700",
+        "fontcolor": "#bf8700",
+        "penwidth": "3",
+    },
+}
+
+
+def _heat_color(level: float) -> str:
+    # from a light to a dark orange
+    low, high = (0xFE, 0xED, 0xDE), (0xD9, 0x48, 0x01)
+    return "#" + "".join(f"{round(a + (b - a) * level):02x}" for a, b in zip(low, high))
+
+
+HEAT_LEVELS = 10
+HEAT_STYLES: List[Dict[str, str]] = [
+    {
+        "style": "filled",
+        "fillcolor": _heat_color(level / (HEAT_LEVELS - 1)),
+    }
+    for level in range(HEAT_LEVELS)
+]
+
+
+def heat_style(value: float) -> Dict[str, str]:
+    return HEAT_STYLES[min(int(value * HEAT_LEVELS), HEAT_LEVELS - 1)]
@@ -0,0 +1,451 @@
+import json
+import time
+
+from typer.testing import CliRunner
+
+from compose_viz import analysis, cli
+from compose_viz.models.compose import Compose
+from compose_viz.models.condition import Condition
+from compose_viz.models.healthcheck import Healthcheck
+from compose_viz.models.port import Port, Protocol
+from compose_viz.models.service import Service
+from compose_viz.models.volume import Volume
+from compose_viz.parser import Parser
+
+WAVES = """
+services:
+  web:
+    image: awesome/web
+    depends_on: [api]
+  api:
+    image: awesome/api
+    depends_on:
+      db:
+        condition: service_healthy
+      migrate:
+        condition: service_completed_successfully
+      cache:
+        condition: service_started
+  migrate:
+    image: awesome/migrate
+    depends_on:
+      db:
+        condition: service_healthy
+  db:
+    image: postgres
+  cache:
+    image: redis
+    depends_on: [db]
+"""
+
+STARTUP = """
+services:
+  web:
+    image: awesome/web
+    depends_on: [api]
+  api:
+    image: awesome/api
+    healthcheck:
+      test: ["CMD", "curl", "-f", "http://localhost"]
+      interval: 10s
+      timeout: 2s
+    depends_on:
+      db:
+        condition: service_healthy
+      migrate:
+        condition: service_completed_successfully
+  migrate:
+    image: awesome/migrate
+    depends_on:
+      db:
+        condition: service_healthy
+  db:
+    image: postgres
+    healthcheck:
+      test: ["CMD", "pg_isready"]
+      interval: 5s
+      timeout: 1m
+      retries: 5
+      start_period: 30s
+      start_interval: 1s
+"""
+
+RESOURCES = """
+services:
+  web:
+    image: awesome/web
+    networks: [front]
+    profiles: [prod]
+    deploy:
+      replicas: 2
+      resources:
+        limits: {cpus: "0.5", memory: 512M, pids: 100}
+        reservations: {cpus: "0.25", memory: 256M}
+  api:
+    image: awesome/api
+    networks: [front, back]
+    cpus: 2
+    mem_limit: 1g
+    pids_limit: 50
+  db:
+    image: postgres
+    networks: [back]
+    deploy:
+      resources:
+        reservations: {memory: 2G}
+"""
+
+PORTS = """
+services:
+  a:
+    image: awesome/a
+    ports: ["8000-8010:8000-8010", "53:53/udp", "9000"]
+  b:
+    image: awesome/b
+    ports: ["127.0.0.1:8005:80", "53:53/tcp", "9000"]
+  c:
+    image: awesome/c
+    ports: ["127.0.0.2:8020:80", "10.0.0.1:53:53/udp"]
+  d:
+    image: awesome/d
+    ports: ["127.0.0.2:8010-8020:80"]
+"""
+
+VOLUMES = """
+services:
+  a:
+    image: awesome/a
+    volumes: ["data:/data", "./shared:/shared:ro", {type: tmpfs, target: /tmp}]
+  b:
+    image: awesome/b
+    ports: ["80:80"]
+    volumes: ["data:/var/data", "./shared:/shared", "logs:/logs"]
+  c:
+    image: awesome/c
+    volumes: [{type: volume, source: data, target: /data, read_only: true}, "logs:/logs:ro"]
+"""
+
+COMPOSE = """
+services:
+  frontend:
+    image: awesome/frontend
+    networks: [front]
+    depends_on: [backend]
+  backend:
+    image: awesome/backend
+    networks: [front, back]
+    volumes: [data:/data]
+    depends_on: [db, cache]
+  db:
+    image: postgres
+    networks: [back]
+    volumes: [data:/var/lib/postgresql/data]
+  cache:
+    image: redis
+    networks: [back]
+    links: [worker]
+  worker:
+    image: awesome/worker
+    depends_on: [cache]
+"""
+
+
+def test_strongly_connected_components() -> None:
+    graph = {"a": ["b"], "b": ["c"], "c": ["b", "d"], "d": []}
+
+    assert analysis.strongly_connected_components(graph) == [["d"], ["b", "c"], ["a"]]
+
+
+def test_compute_stats() -> None:
+    stats = analysis.compute_stats(Parser().parse_string(COMPOSE))
+
+    assert stats["services"] == 5
+    assert stats["networks"] == 2
+    assert stats["volumes"] == 1
+    assert stats["dependencies"] == 5
+    assert list(stats["fan_out"].items())[0] == ("backend", 2)
+    assert stats["fan_in"]["cache"] == 2
+    assert stats["fan_in"]["frontend"] == 0
+    assert stats["longest_chain"] == ["frontend", "backend", "db"]
+    assert stats["cycles"] == [["cache", "worker"]]
+    assert stats["shared_networks"] == {"back": 3, "front": 2}
+    assert stats["shared_volumes"] == {"data": 2}
+
+
+def test_compute_stats_extends() -> None:
+    compose = Parser().parse_string(
+        """
+services:
+  base:
+    image: awesome/base
+  web:
+    extends: {service: base}
+    depends_on: [db]
+  db:
+    image: postgres
+"""
+    )
+    stats = analysis.compute_stats(compose)
+
+    assert stats["dependencies"] == 1
+    assert stats["fan_out"] == {"web": 1, "base": 0, "db": 0}
+    assert stats["fan_in"] == {"db": 1, "base": 0, "web": 0}
+
+
+def test_compute_stats_large() -> None:
+    services = [
+        Service(
+            name=f"service-{index}",
+            depends_on=[f"service-{index - 1}"] if index else [],
+            networks=[f"network-{index % 10}"],
+            volumes=[Volume(source=f"volume-{index % 100}", target="/data")],
+        )
+        for index in range(10000)
+    ]
+
+    start = time.perf_counter()
+    stats = analysis.compute_stats(Compose(services=services))
+
+    assert time.perf_counter() - start < 5
+    assert len(stats["longest_chain"]) == 10000
+    assert stats["components"] == 10000
+
+
+def test_cli_stats(tmpdir) -> None:
+    tmpdir.join("docker-compose.yml").write(COMPOSE)
+    input_path = str(tmpdir.join("docker-compose.yml"))
+
+    result = CliRunner().invoke(cli.app, ["stats", input_path])
+    assert result.exit_code == 0
+    assert "longest dependency chain (3): frontend -> backend -> db\n" in result.stdout
+
+    result = CliRunner().invoke(cli.app, ["stats", "--json", "--fail-on-cycles", input_path])
+    assert result.exit_code == 1
+    assert json.loads(result.stdout)["cycles"] == [["cache", "worker"]]
+
+
+def test_start_waves() -> None:
+    waves = analysis.start_waves(Parser().parse_string(WAVES))
+
+    assert waves["waves"] == [["cache", "db"], ["migrate"], ["api", "web"]]
+    assert waves["waits_on"] == {"api": ["migrate"], "migrate": ["db"]}
+    assert waves["conditions"]["api"]["migrate"] == "service_completed_successfully"
+    assert waves["cycles"] == []
+
+
+def test_start_waves_cycle() -> None:
+    services = [
+        Service(name="a", depends_on=["b"], depends_on_conditions={"b": Condition.service_healthy}),
+        Service(name="b", depends_on=["a"]),
+        Service(name="c", depends_on=["a"], depends_on_conditions={"a": Condition.service_healthy}),
+    ]
+
+    waves = analysis.start_waves(Compose(services=services))
+
+    assert waves["waves"] == [["a", "b"], ["c"]]
+    assert waves["cycles"] == [["a", "b"]]
+
+
+def test_cli_waves(tmpdir) -> None:
+    tmpdir.join("docker-compose.yml").write(WAVES)
+    input_path = str(tmpdir.join("docker-compose.yml"))
+
+    result = CliRunner().invoke(cli.app, ["waves", input_path])
+    assert result.exit_code == 0
+    assert result.stdout == (
+        "wave 0: cache; db\n"
+        "wave 1: migrate <- db (service_healthy)\n"
+        "wave 2: api <- migrate (service_completed_successfully); web\n"
+    )
+
+    result = CliRunner().invoke(cli.app, ["waves", "--json", input_path, "-o", "-", "-m", "dot"])
+    assert result.exit_code == 0
+    assert result.stdout.count("rank=same") == 3
+
+
+def test_health_delays() -> None:
+    assert analysis.health_delays(None) == (0.0, 0.0)
+    assert analysis.health_delays(Healthcheck()) == (30.0, 180.0)
+    assert analysis.health_delays(Healthcheck(interval=5, timeout=1, retries=2, start_period=20)) == (5.0, 32.0)
+
+
+def test_startup_times() -> None:
+    startup = analysis.startup_times(Parser().parse_string(STARTUP))
+
+    assert startup["services"]["db"] == {"expected": 1.0, "worst": 355.0}
+    # the migration only waits for the database, its own run time is unknown
+    assert startup["services"]["migrate"] == {"expected": 1.0, "worst": 355.0}
+    assert startup["services"]["api"] == {"expected": 11.0, "worst": 391.0}
+    # web only needs api to be started
+    assert startup["services"]["web"] == {"expected": 1.0, "worst": 355.0}
+    assert startup["critical_path"] == ["db", "api"]
+    assert startup["worst"] == 391.0
+    assert startup["bottleneck"] == "db"
+
+
+def test_startup_times_without_healthchecks() -> None:
+    startup = analysis.startup_times(Parser().parse_string(WAVES))
+
+    assert startup["critical_path"] == []
+    assert startup["bottleneck"] is None
+
+
+def test_cli_startup(tmpdir) -> None:
+    tmpdir.join("docker-compose.yml").write(STARTUP)
+    input_path = str(tmpdir.join("docker-compose.yml"))
+
+    result = CliRunner().invoke(cli.app, ["startup", input_path])
+    assert result.exit_code == 0
+    assert "critical path: db -> api (11s expected, 391s worst case)\n" in result.stdout
+
+    result = CliRunner().invoke(cli.app, ["startup", input_path, "-o", "-", "-m", "dot"])
+    assert result.exit_code == 0
+    # both services of the critical path and the depends_on edge between them
+    assert result.stdout.count("penwidth=3") == 3
+
+
+def test_resource_budget() -> None:
+    budget = analysis.resource_budget(Parser().parse_string(RESOURCES))
+
+    assert budget["services"]["web"]["cpus_limit"] == 1.0
+    assert budget["services"]["web"]["memory_reserved"] == 512 * 1024**2
+    assert budget["project"] == {
+        "services": 3,
+        "cpus_reserved": 0.5,
+        "cpus_limit": 3.0,
+        "memory_reserved": 2560 * 1024**2,
+        "memory_limit": 2048 * 1024**2,
+        "pids_limit": 250,
+        "unlimited": 1,
+    }
+    assert budget["networks"]["back"]["memory_limit"] == 1024**3
+    assert budget["networks"]["back"]["unlimited"] == 1
+    assert budget["networks"]["front"]["pids_limit"] == 250
+    assert budget["profiles"]["prod"]["pids_limit"] == 200
+    assert list(budget["profiles"]) == ["prod"]
+    assert analysis.resource_heat(budget, "memory") == {"web": 0.5, "api": 0.5, "db": 1.0}
+
+
+def test_format_budget() -> None:
+    budget = analysis.resource_budget(Parser().parse_string(RESOURCES))
+
+    assert analysis.format_budget(budget).splitlines()[:2] == [
+        "scope          services  cpus reserved  cpus limit  memory reserved  memory limit  pids limit  unlimited",
+        "project        3         0.5            3           2.5GiB           2GiB          250         1",
+    ]
+
+
+def test_cli_resources(tmpdir) -> None:
+    tmpdir.join("docker-compose.yml").write(RESOURCES)
+    input_path = str(tmpdir.join("docker-compose.yml"))
+
+    result = CliRunner().invoke(cli.app, ["resources", "--json", input_path])
+    assert result.exit_code == 0
+    assert json.loads(result.stdout)["project"]["cpus_limit"] == 3.0
+    assert json.loads(result.stdout)["services"]["web"]["pids_limit"] == 200
+
+    result = CliRunner().invoke(cli.app, ["resources", input_path, "--heat", "cpus", "-o", "-", "-m", "dot"])
+    assert result.exit_code == 0
+    # db has neither a cpu limit nor a reservation and is not filled
+    assert result.stdout.count("style=filled") == 2
+
+
+def test_host_binding() -> None:
+    assert analysis.host_binding(Port("0.0.0.0:8000-8010", "80")) == ("0.0.0.0", "tcp", 8000, 8010)
+    assert analysis.host_binding(Port("127.0.0.1:53", "53", protocol=Protocol.udp)) == ("127.0.0.1", "udp", 53, 53)
+    assert analysis.host_binding(Port("0.0.0.0:80", "80", published=False)) is None
+
+
+def test_port_conflicts() -> None:
+    conflicts = analysis.port_conflicts(Parser().parse_string(PORTS))
+
+    assert [(conflict["kind"], conflict["services"], conflict["ports"]) for conflict in conflicts] == [
+        # the wildcard address overlaps with 127.0.0.1, the ports published at random do not conflict
+        ("overlap", ["a", "b"], [8005, 8005]),
+        ("overlap", ["a", "d"], [8010, 8010]),
+        ("overlap", ["d", "c"], [8020, 8020]),
+        ("conflict", ["a", "c"], [53, 53]),
+    ]
+    assert conflicts[3]["protocol"] == "udp"
+    assert conflicts[3]["host_ports"] == ["0.0.0.0:53", "10.0.0.1:53"]
+
+
+def test_port_conflicts_large() -> None:
+    services = [
+        Service(name=f"service-{index}", ports=[Port(f"0.0.0.0:{10000 + index * 2}-{10001 + index * 2}", "80")])
+        for index in range(10000)
+    ]
+    services.append(Service(name="duplicate", ports=[Port("0.0.0.0:10001", "80")]))
+
+    conflicts = analysis.port_conflicts(Compose(services=services))
+
+    assert [conflict["services"] for conflict in conflicts] == [["service-0", "duplicate"]]
+
+
+def test_cli_ports(tmpdir) -> None:
+    tmpdir.join("docker-compose.yml").write(PORTS)
+    input_path = str(tmpdir.join("docker-compose.yml"))
+
+    result = CliRunner().invoke(cli.app, ["ports", input_path, "--fail-on-conflicts"])
+    assert result.exit_code == 1
+    assert "conflict on udp 53: a (0.0.0.0:53), c (10.0.0.1:53)\n" in result.stdout
+
+    result = CliRunner().invoke(cli.app, ["ports", input_path, "-o", "-", "-m", "dot"])
+    assert result.exit_code == 0
+    assert 'n0 [label="0.0.0.0:53" color="#cf222e" fontcolor="#cf222e" penwidth=3]' in result.stdout
+
+
+def test_volume_contention() -> None:
+    contention = analysis.volume_contention(Parser().parse_string(VOLUMES))
+
+    assert contention["read_write"] == {"data": {"type": "volume", "writers": ["a", "b"], "readers": ["c"]}}
+    assert contention["bind_mounts"] == {"./shared": {"type": "bind", "writers": ["b"], "readers": ["a"]}}
+    assert contention["tmpfs"] == {"a": ["/tmp"]}
+    # a single writer does not contend with its readers
+    assert analysis.contended_sources(contention) == ["./shared", "data"]
+
+
+def test_volume_contention_tmpfs_key() -> None:
+    compose = Parser().parse_string(
+        """
+services:
+  a:
+    image: awesome/a
+    tmpfs: /run
+  b:
+    image: awesome/b
+    tmpfs: ["/run", "/tmp:size=64m,mode=1777"]
+    volumes: [{type: tmpfs, target: /cache}]
+"""
+    )
+    contention = analysis.volume_contention(compose)
+
+    assert contention["tmpfs"] == {"a": ["/run"], "b": ["/cache", "/run", "/tmp"]}
+    assert analysis.contended_sources(contention) == []
+
+
+def test_contention_subgraph() -> None:
+    compose = Parser().parse_string(VOLUMES)
+    subgraph = analysis.contention_subgraph(compose, analysis.volume_contention(compose))
+
+    assert [service.name for service in subgraph.services] == ["a", "b", "c"]
+    assert [volume.source for volume in subgraph.services[1].volumes] == ["data", "./shared"]
+    assert subgraph.services[1].ports == []
+
+
+def test_cli_volumes(tmpdir) -> None:
+    tmpdir.join("docker-compose.yml").write(VOLUMES)
+    input_path = str(tmpdir.join("docker-compose.yml"))
+
+    result = CliRunner().invoke(cli.app, ["volumes", input_path])
+    assert result.exit_code == 0
+    assert result.stdout == (
+        "shared read-write volume data: a (rw), b (rw), c (ro)\n"
+        "shared bind mount ./shared: b (rw), a (ro)\n"
+        "tmpfs a: /tmp\n"
+    )
+
+    result = CliRunner().invoke(cli.app, ["volumes", input_path, "--contention-only", "-o", "-", "-m", "dot"])
+    assert result.exit_code == 0
+    assert result.stdout.count("penwidth=3") == 2
+    assert "logs" not in result.stdout
@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+import compose_viz
+from compose_viz.graph import Graph
+from compose_viz.parser import Parser
+
+
+def test_render_from_string() -> None:
+    with open("tests/ymls/depends_on/docker-compose.yml", "r") as file:
+        content = file.read()
+
+    output = compose_viz.render(content, "mermaid")
+
+    assert isinstance(output, bytes)
+    assert output.startswith(b"flowchart TB\n")
+
+
+def test_render_invalid_string() -> None:
+    with pytest.raises(RuntimeError, match=r"Error parsing file '<string>'.*"):
+        compose_viz.render("services: [", "mermaid")
+
+
+def test_render_environment(monkeypatch) -> None:
+    monkeypatch.setenv("TAG", "from-shell")
+    content = 'services:\n  web:\n    image: "nginx:${TAG:-latest}"\n'
+
+    assert b"nginx:latest" in compose_viz.render(content, "mermaid")
+    assert b"nginx:stable" in compose_viz.render(content, "mermaid", environment={"TAG": "stable"})
+
+
+def test_render_async() -> None:
+    with open("tests/ymls/depends_on/docker-compose.yml", "r") as file:
+        content = file.read()
+
+    async def render_all() -> list:
+        semaphore = asyncio.Semaphore(2)
+        return await asyncio.gather(
+            *[compose_viz.render_async(content, "mermaid", semaphore=semaphore) for _ in range(4)]
+        )
+
+    outputs = asyncio.run(render_all())
+
+    assert len(outputs) == 4
+    assert all(output == compose_viz.render(content, "mermaid") for output in outputs)
+
+
+def test_graph_render_async(tmp_path) -> None:
+    graph = Graph(Parser().parse("tests/ymls/depends_on/docker-compose.yml"), str(tmp_path / "compose-viz"), False)
+
+    asyncio.run(graph.render_async("mermaid"))
+
+    with open(tmp_path / "compose-viz.mmd", "rb") as output_file:
+        assert output_file.read() == graph.pipe("mermaid")
@@ -40,3 +40,25 @@ def test_cli(test_file_path: str) -> None:
     assert os.path.exists(f"{output_filename}.{default_format}")
 
     os.remove(f"{output_filename}.{default_format}")
+
+
+def test_cli_stream() -> None:
+    input_path = "tests/ymls/depends_on/docker-compose.yml"
+    with open(input_path, "r") as file:
+        content = file.read()
+
+    result = CliRunner(mix_stderr=False).invoke(cli.app, ["-o", "-", "-m", "mermaid", "-"], input=content)
+
+    assert result.exit_code == 0
+    assert result.stdout.startswith("flowchart TB\n")
+    assert "Successfully parsed -\n" in result.stderr
+
+
+def test_cli_overrides() -> None:
+    input_paths = ["tests/ymls/overrides/docker-compose.yml", "tests/ymls/overrides/docker-compose.override.yml"]
+
+    result = CliRunner(mix_stderr=False).invoke(cli.app, ["-o", "-", "-m", "mermaid", *input_paths])
+
+    assert result.exit_code == 0
+    assert "db" in result.stdout
+    assert f"Successfully parsed {', '.join(input_paths)}\n" in result.stderr
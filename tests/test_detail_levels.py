@@ -0,0 +1,44 @@
+from compose_viz.graph import Graph
+from compose_viz.models.detail_levels import DetailLevels
+from compose_viz.parser import Parser
+
+
+def test_detail_levels() -> None:
+    compose = Parser().parse("examples/voting-app/docker-compose.yml")
+
+    full = Graph(compose, "compose-viz-test", False)
+    full.build()
+    networks = Graph(compose, "compose-viz-test", False, detail=DetailLevels.services_networks.value)
+    networks.build()
+    services = Graph(compose, "compose-viz-test", False, detail=DetailLevels.services.value)
+    services.build()
+
+    service_names = {service.name for service in compose.services}
+    assert {vertex.name for vertex in services.vertices.values()} == service_names
+    assert {vertex.name for vertex in networks.vertices.values()} == service_names | {"frontend", "backend"}
+    assert len(full.vertices) == full.count_vertices(DetailLevels.full.value)
+    assert len(full.vertices) > len(networks.vertices)
+
+
+def test_hidden_attributes_in_tooltip() -> None:
+    compose = Parser().parse("examples/voting-app/docker-compose.yml")
+    graph = Graph(compose, "compose-viz-test", False, detail=DetailLevels.services.value)
+    graph.emit()
+
+    assert 'tooltip="networks: frontend\nport: 0.0.0.0:5000 -> 80"' in graph.dot.source
+
+
+def test_detail_auto_downgrade() -> None:
+    compose = Parser().parse("examples/voting-app/docker-compose.yml")
+
+    graph = Graph(compose, "compose-viz-test", False, max_nodes=8)
+    graph.build()
+    assert graph.detail == DetailLevels.services_networks.value
+
+    graph = Graph(compose, "compose-viz-test", False, max_nodes=5)
+    graph.build()
+    assert graph.detail == DetailLevels.services.value
+
+    graph = Graph(compose, "compose-viz-test", False, max_nodes=100)
+    graph.build()
+    assert graph.detail == DetailLevels.full.value
@@ -0,0 +1,76 @@
+from typer.testing import CliRunner
+
+from compose_viz import cli, diff
+from compose_viz.graph import Graph
+from compose_viz.models.overlay import Overlay
+from compose_viz.parser import Parser
+
+OLD = """
+services:
+  frontend:
+    image: awesome/frontend
+    depends_on:
+      - backend
+  backend:
+    image: awesome/backend
+    depends_on:
+      - db
+  db:
+    image: postgres
+  legacy:
+    image: awesome/legacy
+  unrelated:
+    image: awesome/unrelated
+"""
+
+NEW = """
+services:
+  unrelated:
+    image: awesome/unrelated
+  frontend:
+    depends_on:
+      - backend
+    image: awesome/frontend
+  backend:
+    image: awesome/backend:2
+    depends_on:
+      - db
+      - cache
+  db:
+    image: postgres
+  cache:
+    image: redis
+"""
+
+
+def test_service_fingerprint() -> None:
+    old = {service.name: service for service in Parser().parse_string(OLD).services}
+    new = {service.name: service for service in Parser().parse_string(NEW).services}
+
+    assert diff.service_fingerprint(old["frontend"]) == diff.service_fingerprint(new["frontend"])
+    assert diff.service_fingerprint(old["backend"]) != diff.service_fingerprint(new["backend"])
+
+
+def test_diff() -> None:
+    compose, changes = diff.diff(Parser().parse_string(OLD), Parser().parse_string(NEW))
+
+    assert changes == {"backend": "changed", "cache": "added", "legacy": "removed"}
+    assert [service.name for service in compose.services] == ["frontend", "backend", "db", "cache", "legacy"]
+
+    graph = Graph(compose, "compose-viz-test", False, overlay=Overlay(changes=changes))
+    graph.emit()
+    legacy = graph.node_ids["service:legacy"]
+    assert f'{legacy} [label="legacy\n(awesome/legacy)" color="#cf222e"' in graph.dot.source
+
+
+def test_cli_diff(tmpdir) -> None:
+    tmpdir.join("old.yml").write(OLD)
+    tmpdir.join("new.yml").write(NEW)
+
+    result = CliRunner(mix_stderr=False).invoke(
+        cli.app, ["diff", str(tmpdir.join("old.yml")), str(tmpdir.join("new.yml")), "-o", "-", "-m", "csv"]
+    )
+
+    assert result.exit_code == 0
+    assert result.stderr == "1 added, 1 removed, 1 changed\n"
+    assert "service:backend,service:cache,depends_on,\n" in result.stdout
@@ -0,0 +1,119 @@
+import os
+
+from typer.testing import CliRunner
+
+from compose_viz import cli, discovery
+
+APP = """
+services:
+  web:
+    image: awesome/web
+    networks:
+      - proxy
+      - default
+    volumes:
+      - ./static:/static
+      - uploads:/uploads
+    depends_on:
+      - db
+  db:
+    image: postgres
+networks:
+  proxy:
+    external: true
+volumes:
+  uploads:
+"""
+
+INFRA = """
+services:
+  traefik:
+    image: traefik
+    networks:
+      - edge
+networks:
+  edge:
+    name: proxy
+"""
+
+
+def make_tree(tmpdir) -> str:
+    tmpdir.join(".gitignore").write("ignored/\n*.bak.yml\n")
+    tmpdir.mkdir("app").join("docker-compose.yml").write(APP)
+    tmpdir.join("app", "docker-compose.override.yml").write("services:\n  db:\n    image: postgres:16\n")
+    tmpdir.mkdir("infra").join("compose.yml").write(INFRA)
+    tmpdir.join("infra", "docker-compose.bak.yml").write(INFRA)
+    tmpdir.mkdir("ignored").join("docker-compose.yml").write(APP)
+    return str(tmpdir)
+
+
+def test_find_compose_files(tmpdir) -> None:
+    root = make_tree(tmpdir)
+
+    files = discovery.find_compose_files(root)
+
+    assert [os.path.relpath(path, root) for path in files] == [
+        os.path.join("app", "docker-compose.override.yml"),
+        os.path.join("app", "docker-compose.yml"),
+        os.path.join("infra", "compose.yml"),
+    ]
+    assert len(discovery.find_compose_files(root, gitignore=False)) == 5
+    assert len(discovery.find_compose_files(root, excludes=["app/*"])) == 1
+
+
+def test_is_ignored(tmpdir) -> None:
+    tmpdir.mkdir("app").join(".gitignore").write("# generated\nbuild/\n*.yml\n!keep.yml\n/root.yml\n")
+    rules = discovery.load_gitignore(str(tmpdir.join("app")), "app")
+
+    assert discovery.is_ignored("app/build", True, rules)
+    assert not discovery.is_ignored("app/build", False, rules)
+    assert discovery.is_ignored("app/nested/compose.yml", False, rules)
+    assert not discovery.is_ignored("app/keep.yml", False, rules)
+    assert not discovery.is_ignored("compose.yml", False, rules)
+
+
+def test_aggregate(tmpdir) -> None:
+    root = make_tree(tmpdir)
+    projects = discovery.group_projects(root, discovery.find_compose_files(root))
+
+    assert list(projects) == ["app", "infra"]
+    assert len(projects["app"]) == 2
+
+    composes, errors = discovery.parse_projects(projects, max_workers=2)
+    compose = discovery.aggregate(root, projects, composes)
+    services = {service.name: service for service in compose.services}
+
+    assert errors == {}
+    assert list(services) == ["app/web", "app/db", "infra/traefik"]
+    assert services["app/db"].image == "postgres:16"
+    assert services["app/web"].depends_on == ["app/db"]
+    assert services["app/web"].networks == ["proxy", "app/default"]
+    assert services["infra/traefik"].networks == ["proxy"]
+    assert [volume.source for volume in services["app/web"].volumes] == ["app/static", "app/uploads"]
+
+
+def test_cli_discover(tmpdir) -> None:
+    root = make_tree(tmpdir)
+
+    result = CliRunner(mix_stderr=False).invoke(cli.app, ["discover", root, "-o", "-", "-m", "json-adjacency"])
+
+    assert result.exit_code == 0
+    assert "Successfully parsed 2 projects" in result.stderr
+    assert '"id": "network:proxy"' in result.stdout
+
+
+def test_parse_projects_errors(tmpdir) -> None:
+    tmpdir.mkdir("app").join("compose.yaml").write(APP)
+    tmpdir.join("app", "compose.override.yaml").write("services:\n  web:\n    ports: ['80/foo']\n")
+    tmpdir.mkdir("infra").join("compose.yml").write(INFRA)
+    root = str(tmpdir)
+
+    projects = discovery.group_projects(root, discovery.find_compose_files(root))
+    composes, errors = discovery.parse_projects(projects, max_workers=2)
+
+    assert projects["app"] == [
+        str(tmpdir.join("app", "compose.yaml")),
+        str(tmpdir.join("app", "compose.override.yaml")),
+    ]
+    assert list(composes) == ["infra"]
+    assert list(errors) == ["app"]
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+import os
+import xml.etree.ElementTree as ET
+
+from compose_viz import exporters
+from compose_viz.graph import Graph
+from compose_viz.parser import Parser
+
+
+def build_graph() -> Graph:
+    compose = Parser().parse("tests/ymls/depends_on/docker-compose.yml")
+    graph = Graph(compose, "compose-viz-test", False)
+    graph.build()
+    return graph
+
+
+def test_json_adjacency() -> None:
+    graph = build_graph()
+    data = json.loads(exporters.to_json_adjacency(list(graph.vertices.values()), graph.edges))
+
+    assert data["directed"] is True
+    assert [node["id"] for node in data["nodes"]] == [
+        "service:frontend",
+        "service:backend",
+        "service:db",
+        "service:redis",
+    ]
+
+    frontend = data["adjacency"][0]
+    assert [(neighbor["id"], neighbor["type"]) for neighbor in frontend] == [
+        ("service:db", "depends_on"),
+        ("service:redis", "depends_on"),
+    ]
+
+
+def test_graphml() -> None:
+    graph = build_graph()
+    root = ET.fromstring(exporters.to_graphml(list(graph.vertices.values()), graph.edges))
+    namespace = {"g": "http://graphml.graphdrawing.org/xmlns"}
+
+    assert len(root.findall("g:graph/g:node", namespace)) == 4
+    assert len(root.findall("g:graph/g:edge", namespace)) == 4
+
+
+def test_csv() -> None:
+    graph = build_graph()
+    rows = list(csv.reader(io.StringIO(exporters.to_csv(list(graph.vertices.values()), graph.edges))))
+
+    assert rows[0] == ["source", "target", "type", "label"]
+    assert rows[1] == ["service:frontend", "service:db", "depends_on", ""]
+    assert len(rows) == 5
+
+
+def test_mermaid() -> None:
+    graph = build_graph()
+    mermaid = exporters.to_mermaid(list(graph.vertices.values()), graph.edges)
+
+    assert mermaid.startswith("flowchart TB\n")
+    assert '    n0[["frontend<br/>(awesome/frontend)"]]\n' in mermaid
+    assert "    n0 -.-> n2\n" in mermaid
+
+
+def test_d2() -> None:
+    graph = build_graph()
+    d2 = exporters.to_d2(list(graph.vertices.values()), graph.edges)
+
+    assert 'n0: "frontend\\n(awesome/frontend)" {shape: rectangle}\n' in d2
+    assert "n0 -> n2 {style.stroke-dash: 3}\n" in d2
+
+
+def test_plantuml() -> None:
+    graph = build_graph()
+    plantuml = exporters.to_plantuml(list(graph.vertices.values()), graph.edges)
+
+    assert plantuml.startswith("@startuml\n")
+    assert plantuml.endswith("@enduml\n")
+    assert 'component "frontend\\n(awesome/frontend)" as n0\n' in plantuml
+    assert "n0 ..> n2\n" in plantuml
+
+
+def test_render_without_graphviz() -> None:
+    compose = Parser().parse("tests/ymls/depends_on/docker-compose.yml")
+    Graph(compose, "compose-viz-test", False).render("json-adjacency")
+
+    assert os.path.exists("compose-viz-test.json")
+
+    os.remove("compose-viz-test.json")
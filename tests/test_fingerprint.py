@@ -0,0 +1,87 @@
+from typer.testing import CliRunner
+
+from compose_viz import cli
+from compose_viz.graph import Graph
+from compose_viz.parser import Parser
+
+COMPOSE = """
+services:
+  web:
+    image: nginx
+    networks:
+      - db
+    depends_on:
+      - db
+    env_file:
+      - "a:b.env"
+      - ab.env
+  db:
+    image: postgres
+    networks:
+      - db
+"""
+
+REORDERED = """
+services:
+  db:
+    networks:
+      - db
+    image: postgres
+  web:
+    env_file:
+      - "a:b.env"
+      - ab.env
+    depends_on:
+      - db
+    networks:
+      - db
+    image: nginx
+"""
+
+
+def test_collision_free_ids() -> None:
+    graph = Graph(Parser().parse_string(COMPOSE), "compose-viz-test", False)
+    graph.build()
+
+    graph.emit()
+
+    assert sorted(graph.vertices) == ["env_file:a:b.env", "env_file:ab.env", "network:db", "service:db", "service:web"]
+    assert graph.node_ids == {id: f"n{index}" for index, id in enumerate(sorted(graph.vertices))}
+    assert 'n0 [label="a:b.env"]' in graph.dot.source
+    assert 'n1 [label="ab.env"]' in graph.dot.source
+
+
+def test_deterministic_source() -> None:
+    graph = Graph(Parser().parse_string(COMPOSE), "compose-viz-test", False)
+    graph.emit()
+    reordered = Graph(Parser().parse_string(REORDERED), "compose-viz-test", False)
+    reordered.emit()
+
+    assert graph.dot.source == reordered.dot.source
+    assert graph.fingerprint() == reordered.fingerprint()
+
+
+def test_fingerprint_changes() -> None:
+    graph = Graph(Parser().parse_string(COMPOSE), "compose-viz-test", False)
+    changed = Graph(Parser().parse_string(COMPOSE.replace("postgres", "postgres:16")), "compose-viz-test", False)
+
+    assert graph.fingerprint() != changed.fingerprint()
+
+
+def test_cli_fingerprint() -> None:
+    input_path = "tests/ymls/depends_on/docker-compose.yml"
+    graph = Graph(Parser().parse(input_path), "compose-viz-test", False)
+
+    result = CliRunner().invoke(cli.app, ["--fingerprint", input_path])
+
+    assert result.exit_code == 0
+    assert result.stdout == f"{graph.fingerprint()}\n"
+
+
+def test_scoped_styles() -> None:
+    graph = Graph(Parser().parse("examples/voting-app/docker-compose.yml"), "compose-viz-test", False)
+    graph.emit()
+
+    assert graph.dot.source.count("shape=component") == 1
+    assert graph.dot.source.count("style=dotted") == 1
+    assert f'{graph.node_ids["service:vote"]} -> {graph.node_ids["service:redis"]}\n' in graph.dot.source
@@ -0,0 +1,91 @@
+import pytest
+
+from compose_viz import interpolation
+from compose_viz.parser import Parser
+
+
+@pytest.mark.parametrize(
+    "template, expected",
+    [
+        ("no variables", "no variables"),
+        ("${NAME}", "web"),
+        ("$NAME-1", "web-1"),
+        ("${UNSET}", ""),
+        ("${UNSET:-fallback}", "fallback"),
+        ("${EMPTY:-fallback}", "fallback"),
+        ("${EMPTY-fallback}", ""),
+        ("${UNSET-fallback}", "fallback"),
+        ("${NAME:+alternative}", "alternative"),
+        ("${EMPTY:+alternative}", ""),
+        ("${EMPTY+alternative}", "alternative"),
+        ("${UNSET:-${NAME}-default}", "web-default"),
+        ("$${NAME}", "${NAME}"),
+        ("cost: 5$", "cost: 5$"),
+        ("${PORT:-80}:${PORT:-80}", "8080:8080"),
+    ],
+)
+def test_substitute(template: str, expected: str) -> None:
+    environment = {"NAME": "web", "EMPTY": "", "PORT": "8080"}
+
+    assert interpolation.substitute(template, environment) == expected
+
+
+def test_substitute_required() -> None:
+    assert interpolation.substitute("${NAME:?must be set}", {"NAME": "web"}) == "web"
+
+    with pytest.raises(RuntimeError, match="must be set"):
+        interpolation.substitute("${NAME:?must be set}", {"NAME": ""})
+
+    with pytest.raises(RuntimeError, match="NAME"):
+        interpolation.substitute("${NAME?}", {})
+
+
+def test_substitute_invalid() -> None:
+    with pytest.raises(RuntimeError, match="Invalid interpolation format"):
+        interpolation.substitute("${NAME", {})
+
+    with pytest.raises(RuntimeError, match="Invalid interpolation format"):
+        interpolation.substitute("${}", {})
+
+
+def test_compile_template_cached() -> None:
+    interpolation.compile_template.cache_clear()
+
+    for _ in range(3):
+        interpolation.substitute("${IMAGE:-nginx}:${TAG:-latest}", {})
+
+    assert interpolation.compile_template.cache_info().hits == 2
+
+
+def test_interpolate() -> None:
+    data = {"services": {"web": {"image": "${IMAGE}", "ports": ["${PORT}:80"], "scale": 2}}}
+
+    assert interpolation.interpolate(data, {"IMAGE": "nginx", "PORT": "8080"}) == {
+        "services": {"web": {"image": "nginx", "ports": ["8080:80"], "scale": 2}}
+    }
+
+
+def test_load_environment(tmpdir, monkeypatch) -> None:
+    tmpdir.join(".env").write("# comment\nIMAGE=nginx\nexport TAG='1.0'\nPORT=80 # http\nOVERRIDDEN=file\n")
+    monkeypatch.setenv("OVERRIDDEN", "shell")
+
+    environment = interpolation.load_environment(str(tmpdir))
+
+    assert environment["IMAGE"] == "nginx"
+    assert environment["TAG"] == "1.0"
+    assert environment["PORT"] == "80"
+    assert environment["OVERRIDDEN"] == "shell"
+
+
+def test_parse_interpolated(tmpdir, monkeypatch) -> None:
+    compose_file = tmpdir.join("docker-compose.yml")
+    compose_file.write("services:\n  ${FRONTEND:-frontend}:\n    image: ${IMAGE}:${TAG:-latest}\n")
+    tmpdir.join(".env").write("IMAGE=nginx\n")
+
+    compose = Parser(environment={"IMAGE": "nginx", "FRONTEND": "web"}).parse(str(compose_file))
+    assert compose.services[0].name == "${FRONTEND:-frontend}"
+    assert compose.services[0].image == "nginx:latest"
+
+    monkeypatch.delenv("IMAGE", raising=False)
+    compose = Parser().parse(str(compose_file))
+    assert compose.services[0].image == "nginx:latest"
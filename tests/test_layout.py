@@ -0,0 +1,105 @@
+import asyncio
+import os
+import subprocess
+
+import pytest
+
+import compose_viz.layout as layout
+from compose_viz.graph import Graph
+from compose_viz.parser import Parser
+
+
+def test_select_engine() -> None:
+    assert layout.select_engine(10, 20) == "dot"
+    assert layout.select_engine(layout.DOT_MAX_NODES + 1, 20) == "sfdp"
+    assert layout.select_engine(10, layout.DOT_MAX_EDGES + 1) == "sfdp"
+
+
+def test_layout_attempts() -> None:
+    assert layout.layout_attempts("dot") == [
+        ("dot", {}),
+        ("dot", layout.REDUCED_DOT_SETTINGS),
+        ("sfdp", {}),
+    ]
+    assert layout.layout_attempts("neato") == [("neato", {}), ("sfdp", {})]
+    assert layout.layout_attempts("sfdp") == [("sfdp", {})]
+
+
+def test_layout_timeout_fallback(monkeypatch: pytest.MonkeyPatch) -> None:
+    attempts = []
+
+    def fake_run_layout(source, format, engine, timeout, graph_attrs) -> bytes:
+        attempts.append((engine, graph_attrs))
+        if engine == "dot":
+            raise subprocess.TimeoutExpired(engine, timeout)
+        return b"rendered"
+
+    monkeypatch.setattr(layout, "run_layout", fake_run_layout)
+
+    assert layout.run_layout_with_fallback("digraph {}", "svg", "dot", 1) == b"rendered"
+    assert [engine for engine, _ in attempts] == ["dot", "dot", "sfdp"]
+
+
+def test_layout_timeout_exhausted(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fake_run_layout(source, format, engine, timeout, graph_attrs) -> bytes:
+        raise subprocess.TimeoutExpired(engine, timeout)
+
+    monkeypatch.setattr(layout, "run_layout", fake_run_layout)
+
+    with pytest.raises(RuntimeError, match=r"Layout did not finish within 1 seconds.*"):
+        layout.run_layout_with_fallback("digraph {}", "svg", "dot", 1)
+
+
+def test_graph_auto_engine() -> None:
+    compose = Parser().parse("examples/voting-app/docker-compose.yml")
+    graph = Graph(compose, "compose-viz-test", False)
+    graph.build()
+
+    assert graph.select_engine("auto") == "dot"
+    assert graph.select_engine("neato") == "neato"
+
+
+def test_layout_timeout_fallback_async(monkeypatch: pytest.MonkeyPatch) -> None:
+    attempts = []
+
+    async def fake_run_layout_async(source, format, engine, timeout, graph_attrs) -> bytes:
+        attempts.append((engine, graph_attrs))
+        if engine == "dot":
+            raise asyncio.TimeoutError()
+        return b"rendered"
+
+    monkeypatch.setattr(layout, "run_layout_async", fake_run_layout_async)
+
+    assert asyncio.run(layout.run_layout_with_fallback_async("digraph {}", "svg", "dot", 1)) == b"rendered"
+    assert [engine for engine, _ in attempts] == ["dot", "dot", "sfdp"]
+
+
+def test_cancelled_layout_is_killed(monkeypatch: pytest.MonkeyPatch, tmp_path) -> None:
+    engine = tmp_path / "slow-dot"
+    engine.write_text("#!/bin/sh\nexec sleep 30\n")
+    engine.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}:{os.environ['PATH']}")
+
+    processes = []
+    create_subprocess_exec = asyncio.create_subprocess_exec
+
+    async def recording_create_subprocess_exec(*args, **kwargs):
+        process = await create_subprocess_exec(*args, **kwargs)
+        processes.append(process)
+        return process
+
+    monkeypatch.setattr(asyncio, "create_subprocess_exec", recording_create_subprocess_exec)
+
+    async def cancel_layout() -> None:
+        task = asyncio.create_task(layout.run_layout_async("digraph {}", "svg", "slow-dot"))
+        while not processes:
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_layout())
+
+    assert processes[0].returncode is not None
+    with pytest.raises(ProcessLookupError):
+        os.kill(processes[0].pid, 0)
@@ -0,0 +1,40 @@
+import os
+
+from compose_viz import legend
+from compose_viz.graph import Graph
+from compose_viz.parser import Parser
+
+
+def test_render_legend_cached(tmpdir, monkeypatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir))
+    legend.render_legend.cache_clear()
+
+    output = legend.render_legend("svg")
+    cached_files = os.listdir(tmpdir.join("compose-viz"))
+
+    assert len(cached_files) == 1
+    assert cached_files[0].startswith("legend-") and cached_files[0].endswith(".svg")
+
+    # later processes read the legend from disk instead of laying it out again
+    tmpdir.join("compose-viz", cached_files[0]).write_binary(b"cached")
+    legend.render_legend.cache_clear()
+    assert legend.render_legend("svg") == b"cached"
+    assert output != b"cached"
+
+    legend.render_legend.cache_clear()
+
+
+def test_graph_legend_page(tmpdir, monkeypatch) -> None:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir))
+    legend.render_legend.cache_clear()
+    filename = str(tmpdir.join("compose-viz-test"))
+
+    graph = Graph(Parser().parse("tests/ymls/depends_on/docker-compose.yml"), filename, True)
+    graph.render("svg")
+
+    assert "rankdir" not in graph.dot.source
+    assert "invis" not in graph.dot.source
+    assert os.path.exists(f"{filename}.svg")
+    assert os.path.exists(f"{filename}-legend.svg")
+
+    legend.render_legend.cache_clear()
@@ -0,0 +1,64 @@
+from compose_viz import parser
+from compose_viz.merge import merge
+from compose_viz.parser import Parser
+
+
+def test_merge() -> None:
+    base = {"services": {"web": {"image": "nginx", "labels": {"tier": "front"}}, "db": {"image": "postgres"}}}
+    override = {"services": {"web": {"image": "nginx:alpine"}}}
+
+    merged = merge(base, override)
+
+    assert merged == {
+        "services": {"web": {"image": "nginx:alpine", "labels": {"tier": "front"}}, "db": {"image": "postgres"}}
+    }
+    assert base["services"]["web"]["image"] == "nginx"
+    assert merged["services"]["db"] is base["services"]["db"]
+    assert merged["services"]["web"]["labels"] is base["services"]["web"]["labels"]
+
+
+def test_merge_sequences() -> None:
+    base = {
+        "command": ["serve", "--debug"],
+        "environment": ["DEBUG=1", "PORT=80"],
+        "ports": ["80:80"],
+        "volumes": ["./data:/data", "logs:/logs"],
+        "depends_on": ["db"],
+    }
+    override = {
+        "command": ["serve"],
+        "environment": ["DEBUG=0"],
+        "ports": ["80:80", "443:443"],
+        "volumes": [{"type": "volume", "source": "data", "target": "/data"}],
+        "depends_on": {"cache": {"condition": "service_healthy"}},
+    }
+
+    assert merge(base, override) == {
+        "command": ["serve"],
+        "environment": ["DEBUG=0", "PORT=80"],
+        "ports": ["80:80", "443:443"],
+        "volumes": [{"type": "volume", "source": "data", "target": "/data"}, "logs:/logs"],
+        "depends_on": {"db": {"condition": "service_started"}, "cache": {"condition": "service_healthy"}},
+    }
+
+
+def test_parse_overrides() -> None:
+    compose = Parser().parse(
+        ["tests/ymls/overrides/docker-compose.yml", "tests/ymls/overrides/docker-compose.override.yml"]
+    )
+    services = {service.name: service for service in compose.services}
+
+    assert list(services) == ["frontend", "backend", "db"]
+    assert services["frontend"].depends_on == ["backend", "db"]
+    assert [port.container_port for port in services["frontend"].ports] == ["3000", "443"]
+    assert [volume.source for volume in services["backend"].volumes] == ["data"]
+    assert services["backend"].networks == ["back-tier"]
+
+
+def test_parse_file_once() -> None:
+    parser._load_file.cache_clear()
+
+    for _ in range(3):
+        Parser().parse(["tests/ymls/overrides/docker-compose.yml", "tests/ymls/overrides/docker-compose.override.yml"])
+
+    assert parser._load_file.cache_info().misses == 2
@@ -0,0 +1,26 @@
+from compose_viz.models.overlay import Overlay
+
+
+def test_overlay_init_normal() -> None:
+    try:
+        o = Overlay()
+
+        assert o.changes == {}
+        assert o.ranks == []
+        assert o.highlights == {}
+        assert o.edge_highlights == {}
+        assert o.heat == {}
+        assert o.changes is not Overlay().changes
+    except Exception as e:
+        assert False, e
+
+
+def test_overlay_with_highlights() -> None:
+    try:
+        o = Overlay(highlights={"service:db": "critical"}, edge_highlights={("service:api", "service:db"): "critical"})
+
+        assert o.highlights == {"service:db": "critical"}
+        assert o.edge_highlights == {("service:api", "service:db"): "critical"}
+        assert o.changes == {}
+    except Exception as e:
+        assert False, e
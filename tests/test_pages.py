@@ -0,0 +1,65 @@
+from compose_viz.legend import legend_filename
+from compose_viz.models.compose import Compose
+from compose_viz.models.service import Service
+from compose_viz.pages import DEFAULT_PAGE, page_filename, partition_by_network, render_index
+from compose_viz.parser import Parser
+
+
+def test_partition_by_network() -> None:
+    compose = Parser().parse("tests/ymls/networks/docker-compose.yml")
+    pages = partition_by_network(compose)
+
+    assert sorted(pages.keys()) == ["admin", "back-tier", "front-tier"]
+
+    front_tier, front_tier_references = pages["front-tier"]
+    assert [service.name for service in front_tier.services] == ["frontend"]
+    assert front_tier_references == {}
+
+    back_tier, back_tier_references = pages["back-tier"]
+    assert [service.name for service in back_tier.services] == ["frontend", "backend"]
+    assert back_tier_references == {"frontend": "front-tier"}
+
+    admin, admin_references = pages["admin"]
+    assert [service.name for service in admin.services] == ["monitoring", "backend"]
+    assert admin_references == {"backend": "back-tier"}
+
+
+def test_partition_dependency_stubs() -> None:
+    compose = Compose(
+        services=[
+            Service(name="web", image="web", networks=["front"], depends_on=["db"]),
+            Service(name="db", image="db", networks=["back"]),
+            Service(name="worker", image="worker", links=["db:database"]),
+        ]
+    )
+    pages = partition_by_network(compose)
+
+    front, front_references = pages["front"]
+    assert [service.name for service in front.services] == ["web", "db"]
+    assert front_references == {"db": "back"}
+
+    default, default_references = pages[DEFAULT_PAGE]
+    assert [service.name for service in default.services] == ["worker", "db"]
+    assert default_references == {"db": "back"}
+
+
+def test_page_filename() -> None:
+    assert f"{page_filename('compose-viz', 'legend')}.svg" != legend_filename("compose-viz", "svg")
+    assert page_filename("compose-viz", "legend") == "compose-viz-page-legend"
+
+
+def test_render_index(tmp_path) -> None:
+    compose = Compose(
+        services=[
+            Service(name="web", image="web", networks=["node"], depends_on=["db"]),
+            Service(name="db", image="db", networks=["back tier"]),
+        ]
+    )
+    filename = str(tmp_path / "compose-viz")
+
+    render_index(partition_by_network(compose), filename, "dot")
+
+    with open(f"{filename}.dot", "r") as index_file:
+        index = index_file.read()
+    assert "n1 -> n0" in index
+    assert 'URL="compose-viz-page-back tier.dot"' in index
@@ -0,0 +1,34 @@
+from compose_viz.graph import Graph
+from compose_viz.parser import Parser
+
+COMPOSE = """
+services:
+  web:
+    image: nginx
+    volumes:
+      - data:/var/www
+      - data:/var/cache
+      - data:/var/cache
+    ports:
+      - "127.0.0.1:8080:80"
+      - "127.0.0.1:8080:80/udp"
+volumes:
+  data:
+"""
+
+
+def test_coalesce_parallel_edges() -> None:
+    graph = Graph(Parser().parse_string(COMPOSE), "compose-viz-test", False)
+    graph.build()
+
+    labels = {(edge.head, edge.tail): edge.label for edge in graph.edges}
+    assert len(graph.edges) == 2
+    assert labels[("service:web", "volume:data")] == "/var/www\n/var/cache"
+    assert labels[("port:127.0.0.1:8080", "service:web")] == "80\n80/udp"
+
+
+def test_keep_parallel_edges() -> None:
+    graph = Graph(Parser().parse_string(COMPOSE), "compose-viz-test", False, coalesce_edges=False)
+    graph.build()
+
+    assert len(graph.edges) == 5
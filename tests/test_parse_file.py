@@ -177,7 +177,7 @@ from compose_viz.parser import Parser
                                 container_port="7777",
                             ),
                             Port(
-                                host_port="${BIND_IP:-127.0.0.1}:8080",
+                                host_port="127.0.0.1:8080",
                                 container_port="8080",
                             ),
                             Port(
@@ -205,6 +205,7 @@ from compose_viz.parser import Parser
                             Volume(
                                 source="./data",
                                 target="/data",
+                                type=VolumeType.bind,
                             ),
                             Volume(
                                 source="/var/run/postgres/postgres.sock",
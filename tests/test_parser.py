@@ -1,6 +1,7 @@
 import pytest
 
-from compose_viz.parser import Parser
+from compose_viz.models.condition import Condition
+from compose_viz.parser import Parser, parse_bytes, parse_duration
 
 
 def test_parser_invalid_yaml() -> None:
@@ -16,3 +17,124 @@ def test_parser_empty_yaml() -> None:
 def test_parser_no_services_found() -> None:
     with pytest.raises(AssertionError, match=r"No services found, aborting."):
         Parser().parse("tests/ymls/others/no-services.yml")
+
+
+def test_parser_parse_string() -> None:
+    with open("tests/ymls/depends_on/docker-compose.yml", "r") as file:
+        compose = Parser().parse_string(file.read())
+
+    assert [service.name for service in compose.services] == ["frontend", "backend", "db", "redis"]
+
+
+def test_parser_external_resources() -> None:
+    compose = Parser().parse_string(
+        "services:\n  web:\n    image: nginx\n"
+        "networks:\n  proxy:\n    external: true\n  edge:\n    name: traefik\n  backend:\n"
+        "volumes:\n  data:\n    external: true\n    name: shared-data\n  cache:\n    external: false\n"
+    )
+
+    assert compose.external_networks == {"proxy": "proxy", "edge": "traefik"}
+    assert compose.external_volumes == {"data": "shared-data"}
+
+
+def test_parser_depends_on_conditions() -> None:
+    services = {
+        service.name: service for service in Parser().parse("tests/ymls/depends_on/docker-compose.yml").services
+    }
+
+    assert services["frontend"].depends_on_conditions == {
+        "db": Condition.service_healthy,
+        "redis": Condition.service_started,
+    }
+    assert services["backend"].depends_on_conditions == {
+        "db": Condition.service_started,
+        "redis": Condition.service_started,
+    }
+
+
+def test_parser_healthcheck() -> None:
+    compose = Parser().parse_string(
+        "services:\n"
+        "  db:\n"
+        "    image: postgres\n"
+        "    healthcheck:\n"
+        '      test: ["CMD", "pg_isready"]\n'
+        "      interval: 1m30s\n"
+        "      retries: 5\n"
+        "      start_period: 500ms\n"
+        "  cache:\n"
+        "    image: redis\n"
+        "    healthcheck:\n"
+        "      disable: true\n"
+    )
+    healthcheck = compose.services[0].healthcheck
+
+    assert healthcheck.interval == 90.0
+    assert healthcheck.timeout == 30.0
+    assert healthcheck.retries == 5
+    assert healthcheck.start_period == 0.5
+    assert compose.services[1].healthcheck is None
+
+
+def test_parse_duration() -> None:
+    assert parse_duration("1h2m3s") == 3723.0
+    assert parse_duration(None, 30.0) == 30.0
+
+    with pytest.raises(AssertionError, match=r"Invalid duration '10 seconds', aborting."):
+        parse_duration("10 seconds")
+
+
+def test_parser_resources() -> None:
+    compose = Parser().parse_string(
+        "services:\n"
+        "  web:\n"
+        "    image: nginx\n"
+        "    cpus: 4\n"
+        "    pids_limit: 100\n"
+        "    deploy:\n"
+        "      replicas: 2\n"
+        "      resources:\n"
+        "        limits: {cpus: '0.5', memory: 512M}\n"
+        "        reservations: {memory: 1.5g}\n"
+    )
+    resources = compose.services[0].resources
+
+    assert resources.cpus_limit == 0.5
+    assert resources.memory_limit == 512 * 1024**2
+    assert resources.pids_limit == 100
+    assert resources.cpus_reservation is None
+    assert resources.memory_reservation == 1536 * 1024**2
+    assert resources.replicas == 2
+
+
+def test_parse_bytes() -> None:
+    assert parse_bytes("1024") == 1024
+    assert parse_bytes("2GB") == 2 * 1024**3
+    assert parse_bytes(None) is None
+
+    with pytest.raises(AssertionError, match=r"Invalid byte value '1 gigabyte', aborting."):
+        parse_bytes("1 gigabyte")
+
+
+def test_parser_unpublished_ports() -> None:
+    compose = Parser().parse_string(
+        "services:\n"
+        "  web:\n"
+        "    image: nginx\n"
+        "    ports: ['80', '8080:80', {target: 443}, {target: 53, published: 53}]\n"
+    )
+
+    assert [port.published for port in compose.services[0].ports] == [False, True, False, True]
+
+
+def test_parser_read_only_volume() -> None:
+    compose = Parser().parse_string(
+        "services:\n"
+        "  web:\n"
+        "    image: nginx\n"
+        "    volumes:\n"
+        "      - {type: volume, source: data, target: /data, read_only: true}\n"
+        "      - {type: bind, source: ./html, target: /html}\n"
+    )
+
+    assert [volume.access_mode for volume in compose.services[0].volumes] == ["ro", "rw"]
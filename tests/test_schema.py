@@ -0,0 +1,61 @@
+import json
+
+import pytest
+from typer.testing import CliRunner
+
+from compose_viz import cli, schema
+from compose_viz.parser import Parser
+
+pytest.importorskip("fastjsonschema")
+
+SCHEMA = {
+    "$schema": "https://json-schema.org/draft-07/schema",
+    "type": "object",
+    "properties": {
+        "services": {
+            "type": "object",
+            "patternProperties": {"^[a-zA-Z0-9._-]+$": {"$ref": "#/definitions/service"}},
+        },
+    },
+    "definitions": {
+        "service": {
+            "type": "object",
+            "properties": {"image": {"type": "string"}, "ports": {"type": "array"}},
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+@pytest.fixture
+def schema_path(tmpdir, monkeypatch) -> str:
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmpdir.join("cache")))
+    tmpdir.join("compose-spec.json").write(json.dumps(SCHEMA))
+    return str(tmpdir.join("compose-spec.json"))
+
+
+def test_schema_validation(schema_path, tmpdir) -> None:
+    parser = Parser(schema_path=schema_path)
+
+    compose = parser.parse_string("services:\n  web:\n    image: nginx\n    ports: ['80:80']\n")
+    assert compose.services[0].name == "web"
+
+    with pytest.raises(RuntimeError, match=r"Error parsing file '<string>': data.services.web.ports must be array"):
+        parser.parse_string("services:\n  web:\n    image: nginx\n    ports: 80\n")
+
+    # the compiled validator is kept on disk for the next run
+    assert len(tmpdir.join("cache", "compose-viz").listdir("schema-*.py")) == 1
+
+
+def test_schema_not_found(tmpdir) -> None:
+    with pytest.raises(RuntimeError, match=r"Compose schema not found at '.*missing.json'"):
+        schema.load_validator(str(tmpdir.join("missing.json")))
+
+
+def test_cli_validate_schema(schema_path) -> None:
+    input_path = "tests/ymls/depends_on/docker-compose.yml"
+
+    result = CliRunner().invoke(cli.app, [input_path, "--schema", schema_path, "--fingerprint"])
+
+    assert isinstance(result.exception, RuntimeError)
+    assert "must not contain" in str(result.exception)
@@ -0,0 +1,93 @@
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from compose_viz.server import RenderServer, RenderService, content_type
+
+
+@pytest.fixture
+def server():
+    server = RenderServer("127.0.0.1", 0, RenderService(workers=2))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def post(server: RenderServer, query: str, content: bytes) -> urllib.request.Request:
+    return urllib.request.Request(
+        f"http://127.0.0.1:{server.server_port}/render?{query}",
+        data=content,
+        method="POST",
+    )
+
+
+def test_server_render(server: RenderServer) -> None:
+    with open("tests/ymls/depends_on/docker-compose.yml", "rb") as file:
+        content = file.read()
+
+    for _ in range(2):
+        with urllib.request.urlopen(post(server, "format=mermaid", content)) as response:
+            assert response.status == 200
+            assert response.read().startswith(b"flowchart TB\n")
+
+    assert server.service.parse.cache_info().hits == 1
+
+
+def test_content_type(server: RenderServer) -> None:
+    assert content_type("mermaid") == "text/plain; charset=utf-8"
+    assert content_type("json-adjacency") == "text/plain; charset=utf-8"
+    assert content_type("svg") == "image/svg+xml"
+    assert content_type("json") == "application/json"
+    assert content_type("plain") == "text/plain; charset=utf-8"
+    assert content_type("xdot") == "text/plain; charset=utf-8"
+    assert content_type("emf") == "application/octet-stream"
+
+    with open("tests/ymls/depends_on/docker-compose.yml", "rb") as file:
+        content = file.read()
+    with urllib.request.urlopen(post(server, "format=mermaid", content)) as response:
+        assert response.headers["Content-Type"] == "text/plain; charset=utf-8"
+
+
+def test_server_invalid_file(server: RenderServer) -> None:
+    with open("tests/ymls/others/no-services.yml", "rb") as file:
+        content = file.read()
+
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(post(server, "format=mermaid", content))
+    assert e.value.code == 400
+    assert e.value.read() == b"No services found, aborting.\n"
+
+
+def test_server_invalid_format(server: RenderServer) -> None:
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(post(server, "format=nope", b""))
+    assert e.value.code == 400
+
+
+def test_server_ignores_host_environment(server: RenderServer, monkeypatch) -> None:
+    monkeypatch.setenv("SECRET_TOKEN", "hunter2")
+    content = b'services:\n  web:\n    image: "${SECRET_TOKEN:-none}"\n'
+
+    with urllib.request.urlopen(post(server, "format=mermaid", content)) as response:
+        output = response.read()
+
+    assert b"hunter2" not in output
+    assert b"(none)" in output
+
+
+def test_server_parser_error(server: RenderServer) -> None:
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(post(server, "format=mermaid", b"services:\n  web:\n    ports: ['80/foo']\n"))
+    assert e.value.code == 400
+
+
+def test_server_body_too_large(server: RenderServer) -> None:
+    server.max_body_size = 16
+
+    with pytest.raises(urllib.error.HTTPError) as e:
+        urllib.request.urlopen(post(server, "format=mermaid", b"services:\n  web:\n    image: nginx\n"))
+    assert e.value.code == 413
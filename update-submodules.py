@@ -27,16 +27,17 @@ def update_version_number():
     with open("./compose_viz/__init__.py", "r+") as init_file:
         init_content: str = init_file.read()
 
-        version_number = init_content.split(" ")[-1].replace('"', "").strip()
+        version_match = re.search(r'__version__ = "(.+)"', init_content)
+        assert version_match is not None
+        version_number = version_match.group(1)
         major, minor, patch = version_number.split(".")
         new_version_number = f"{major}.{minor}.{int(patch) + 1}"
 
+        init_content = init_content.replace(version_match.group(0), f'__version__ = "{new_version_number}"')
+
         init_file.seek(0)
-        init_file.write(
-            f"""__app_name__ = "compose_viz"
-__version__ = "{new_version_number}"
-"""
-        )
+        init_file.write(init_content)
+        init_file.truncate()
 
     with open("./pyproject.toml", "r+") as pyproject_file:
         pyproject_content: str = pyproject_file.read()